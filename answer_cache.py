@@ -0,0 +1,160 @@
+# answer_cache.py
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from crawl_store import write_json_atomic
+from retrieval import tokenize
+
+# Answers older than a day are asked again, as the site may have changed without a new crawl
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# Cosine similarity above which a differently worded question reuses a cached answer
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+
+# Lower-case words without diacritics, so "Kur është afati?" and "kur eshte  afati" share one entry
+def normalize_question(question: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", question)
+    return " ".join(tokenize("".join(char for char in decomposed if not unicodedata.combining(char))))
+
+
+# Hit and miss counts of an answer cache, and the assistant time the hits avoided
+class AnswerCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.near_hits + self.misses
+        return (self.hits + self.near_hits) / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Answer cache: {self.hit_rate():.0%} hit rate ({self.hits} exact, {self.near_hits} similar, "
+            f"{self.misses} misses), {self.seconds_saved:.1f} s of assistant time saved"
+        )
+
+
+# Answers to earlier questions, shared by every session and kept in a JSON file across restarts.
+# Every entry belongs to the corpus version (the SHA-256 of output.txt) it was answered from and is only
+# reused for that version, so sessions that scraped different crawls share the cache without clearing it.
+# Entries of versions nobody asks about any more age out through the TTL and max_entries.
+# Answers are keyed on the question alone, so callers only cache questions asked without earlier turns.
+class AnswerCache:
+    def __init__(
+        self,
+        path: str = "data/answer_cache.json",
+        max_entries: int = 1000,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        embedder: Optional[Callable[[List[str]], np.ndarray]] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.stats = AnswerCacheStats()
+        # (corpus version, normalized question) -> entry, least recently used first
+        self._entries: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+        self._vectors: Dict[Tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        for entry in stored.get("entries", []):
+            # Files written before entries carried their version have a single one for the whole file
+            entry.setdefault("corpus_version", stored.get("corpus_version"))
+            self._entries[(entry["corpus_version"], entry["question"])] = entry
+        self._drop_expired()
+        self._embed_entries()
+
+    def _save(self) -> None:
+        write_json_atomic(self.path, {"entries": list(self._entries.values())})
+
+    # Embeddings are recomputed rather than stored, they are cheap for short questions
+    def _embed_entries(self) -> None:
+        self._vectors = {}
+        if self.embedder is not None and self._entries:
+            keys = list(self._entries)
+            self._vectors = dict(zip(keys, self.embedder([question for _, question in keys])))
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        del self._entries[key]
+        self._vectors.pop(key, None)
+
+    def _drop_expired(self) -> None:
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if now - entry["created_at"] > self.ttl_seconds]:
+            self._remove(key)
+
+    # The most similar question answered for the same corpus version, if it is similar enough
+    def _similar_key(self, key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        keys = [other for other in self._vectors if other[0] == key[0]]
+        if not keys:
+            return None
+        similarity = np.vstack([self._vectors[k] for k in keys]) @ self.embedder([key[1]])[0]
+        best = int(np.argmax(similarity))
+        return keys[best] if similarity[best] >= self.similarity_threshold else None
+
+    # Cached answer to a question about the given corpus version, or None
+    def get(self, question: str, corpus_version: str) -> Optional[str]:
+        key = (corpus_version, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            exact = entry is not None
+            if entry is None:
+                similar_key = self._similar_key(key)
+                entry = self._entries.get(similar_key) if similar_key is not None else None
+            if entry is not None and time.time() - entry["created_at"] > self.ttl_seconds:
+                self._remove((corpus_version, entry["question"]))
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            if exact:
+                self.stats.hits += 1
+            else:
+                self.stats.near_hits += 1
+            self.stats.seconds_saved += entry["latency"]
+            self._entries.move_to_end((corpus_version, entry["question"]))
+            return entry["answer"]
+
+    # Remember an answer together with the time the assistant took to produce it
+    def put(self, question: str, answer: str, corpus_version: str, latency: float) -> None:
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        key = (corpus_version, normalized)
+        with self._lock:
+            self._entries[key] = {
+                "question": normalized,
+                "corpus_version": corpus_version,
+                "answer": answer,
+                "created_at": time.time(),
+                "latency": latency,
+            }
+            self._entries.move_to_end(key)
+            if self.embedder is not None:
+                self._vectors[key] = self.embedder([normalized])[0]
+            self._drop_expired()
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -2,59 +2,84 @@
 
 import os
 import asyncio
-import json
 import streamlit as st
+from answer_cache import AnswerCache
+from assistant_registry import AssistantRegistry
 from config import client
-from scraper import crawl_links
+from crawl_store import iter_output_json, write_text_output
+from dedup import ContentDeduplicator
+from retrieval import HashingEmbedder, build_index, file_sha256
+from scraper import CrawlStats, crawl_links
 from chat_app import run_chatbot  
 
 os.makedirs("data", exist_ok=True)
 
-# Caching the file upload to avoid redundant uploads
+# Uploads and assistants are registered by content hash, so they survive restarts and re-crawls
 @st.cache_resource
+def load_assistant_registry():
+    return AssistantRegistry(client, "data/assistant_registry.json")
+
+# Upload a file only if the same content has not been uploaded before
 def upload_file(file_path):
-    return client.files.create(
-        file=open(file_path, 'rb'),
-        purpose="assistants"
-    )
+    return load_assistant_registry().upload_file(file_path, purpose="assistants")
 
-# Caching the assistant 
-@st.cache_resource
-def create_assistant(file_id):
-    return client.beta.assistants.create(
-        name="UBT assistant",
-        instructions=(
+# Reuse the assistant with the same configuration; without a file it answers from excerpts sent with each question
+def create_assistant(file_id=None):
+    if file_id is None:
+        source_instructions = (
+            "You are a helpful assistant. You answer questions solely based on the excerpts sent together with each question. "
+            "Do not use or refer to any external information or sources outside of these excerpts. "
+        )
+        unknown_instructions = "If the excerpts do not contain the requested information, inform them that you cannot answer that question. "
+        hidden_source_instructions = "Do not explicitly mention that you are using excerpts for your responses."
+        tools = []
+        tool_resources = {}
+    else:
+        source_instructions = (
             "You are a helpful assistant. You answer questions solely based on the content of the provided 'output.txt' file. "
             "Do not use or refer to any external information or sources outside of this file. "
-            "Respond in the same language as the user's input; always respond in Albanian. "
-            "Do not include filenames, page numbers, or external references. "
-            "If the user asks for information not contained within 'output.txt', inform them that you cannot answer that question. "
-            "Maintain the flow of conversation by referencing previous interactions when relevant."
-            "Do not explicitly mention that you are using the 'output.txt' file for your responses."
-        ),
-        model="gpt-4o-mini", 
-        tools=[{"type": "code_interpreter"}],
-        tool_resources={
+        )
+        unknown_instructions = "If the user asks for information not contained within 'output.txt', inform them that you cannot answer that question. "
+        hidden_source_instructions = "Do not explicitly mention that you are using the 'output.txt' file for your responses."
+        tools = [{"type": "code_interpreter"}]
+        tool_resources = {
             "code_interpreter": {
                 "file_ids": [file_id]
             }
         }
+
+    return load_assistant_registry().assistant(
+        name="UBT assistant",
+        instructions=(
+            source_instructions
+            + "Respond in the same language as the user's input; always respond in Albanian. "
+            "Do not include filenames, page numbers, or external references. "
+            + unknown_instructions
+            + "Maintain the flow of conversation by referencing previous interactions when relevant. "
+            + hidden_source_instructions
+        ),
+        model="gpt-4o-mini", 
+        tools=tools,
+        tool_resources=tool_resources
     )
 
-async def run_scraping(url, exclude_links, max_links, output_file, text_output_file, scraped_urls_placeholder):
-    scraped_links = await crawl_links(url, exclude_links, max_links, output_file)
+# One answer cache for every session of this process, backed by a file that survives restarts
+@st.cache_resource
+def load_answer_cache():
+    return AnswerCache("data/answer_cache.json", embedder=HashingEmbedder())
+
+async def run_scraping(url, exclude_links, max_links, output_file, text_output_file, scraped_urls_placeholder, concurrency=4, incremental=False):
+    stats = CrawlStats()
+    scraped_links = await crawl_links(url, exclude_links, max_links, output_file, concurrency, stats=stats, incremental=incremental)
     
     try:
-        with open(output_file, "r", encoding="utf-8") as json_file:
-            data = json.load(json_file)
+        # Drop near-duplicate pages and repeated blocks before writing the assistant's corpus
+        deduplicator = ContentDeduplicator()
+        write_text_output(deduplicator.dedup_pages(iter_output_json(output_file)), text_output_file)
 
-        with open(text_output_file, "w", encoding="utf-8") as text_file:
-            for link, content in data.items():
-                text_file.write(f"Content:\n{content}\n")
-                text_file.write("=" * 80 + "\n")  
-
-        scraped_urls = list(data.keys())
-        scraped_urls_placeholder.text_area("Scraped URLs:", value="\n".join(scraped_urls), height=300)
+        scraped_urls_placeholder.text_area("Scraped URLs:", value="\n".join(scraped_links), height=300)
+        st.text(stats.summary())
+        st.text(deduplicator.stats.summary())
     except Exception as e:
         st.error(f"Error converting JSON to text: {e}")
 
@@ -69,6 +94,9 @@ with tab_scraping:
     with st.form(key="scraping_form"):
         url = st.text_input("Enter the URL to scrape:", value="https://www.ubt-uni.net/sq/ubt/")
         max_links = st.number_input("Maximum number of links to scrape:", min_value=10, max_value=1000, value=150, step=10)
+        concurrency = st.number_input("Pages fetched in parallel:", min_value=1, max_value=16, value=4, step=1)
+        incremental = st.checkbox("Only re-fetch pages that changed since the last crawl", value=True)
+        use_local_index = st.checkbox("Answer from a local search index instead of uploading output.txt", value=True)
         submit_button = st.form_submit_button("Start Scraping")
     
     if submit_button:
@@ -77,6 +105,7 @@ with tab_scraping:
         else:
             output_file = "data/output.json"
             text_output_file = "data/output.txt"
+            index_dir = "data/index"
             exclude_links = set()
             
             # Display progress and status
@@ -88,13 +117,21 @@ with tab_scraping:
                         max_links=max_links,
                         output_file=output_file,
                         text_output_file=text_output_file,
-                        scraped_urls_placeholder=st.empty() 
+                        scraped_urls_placeholder=st.empty(),
+                        concurrency=concurrency,
+                        incremental=incremental
                     ))
                     
-                    my_file = upload_file(text_output_file)
-                    
-                    if "my_assistant" not in st.session_state:
+                    if use_local_index:
+                        # Questions are answered from the top-ranked chunks instead of the whole file
+                        st.session_state["retrieval_index"] = build_index(text_output_file, index_dir, embedder=HashingEmbedder())
+                        st.session_state["my_assistant"] = create_assistant()
+                    else:
+                        my_file = upload_file(text_output_file)
+                        st.session_state.pop("retrieval_index", None)
                         st.session_state["my_assistant"] = create_assistant(my_file.id)
+                    # Cached answers are only reused for questions about this same output.txt content
+                    st.session_state["corpus_version"] = file_sha256(text_output_file)
                     st.success("Scraping and assistant setup completed successfully!")
                 except Exception as e:
                     st.error(f"An error occurred during scraping: {e}")
@@ -108,4 +145,10 @@ with tab_chatbot:
     else:
         my_assistant = st.session_state["my_assistant"]
         
-        run_chatbot(my_assistant, client)
\ No newline at end of file
+        run_chatbot(
+            my_assistant,
+            client,
+            st.session_state.get("retrieval_index"),
+            answer_cache=load_answer_cache(),
+            corpus_version=st.session_state.get("corpus_version"),
+        )
\ No newline at end of file
@@ -0,0 +1,148 @@
+# assistant_registry.py
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+import hashlib
+import json
+import os
+import threading
+
+import openai
+
+from crawl_store import write_json_atomic
+from retrieval import file_sha256
+
+# Superseded files and assistants stay this long after their last use: sessions that started before a
+# re-crawl keep the assistant they were given and would get a 404 for every question once it is deleted
+GARBAGE_GRACE_SECONDS = 24 * 3600
+
+
+def _config_sha256(config: dict) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Remote files and assistants keyed by the SHA-256 of what they were created from, kept in a JSON file.
+# An unchanged corpus or assistant configuration is reused across restarts instead of created again,
+# and whatever newer corpora or configurations supersede is deleted on the remote side once no session
+# is likely to still hold it.
+class AssistantRegistry:
+    def __init__(
+        self,
+        client,
+        path: str = "data/assistant_registry.json",
+        keep_versions: int = 2,
+        grace_seconds: float = GARBAGE_GRACE_SECONDS,
+    ):
+        self.client = client
+        self.path = path
+        self.keep_versions = keep_versions
+        self.grace_seconds = grace_seconds
+        self.files: Dict[str, dict] = {}
+        self.assistants: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            self.files = stored.get("files", {})
+            self.assistants = stored.get("assistants", {})
+
+    def save(self) -> None:
+        write_json_atomic(self.path, {"files": self.files, "assistants": self.assistants})
+
+    # The uploaded file with the content of file_path, uploading it only if no such file exists yet
+    def upload_file(self, file_path: str, purpose: str = "assistants"):
+        digest = file_sha256(file_path)
+        with self._lock:
+            entry = self.files.get(digest)
+            if entry is not None:
+                try:
+                    remote_file = self.client.files.retrieve(entry["file_id"])
+                    entry["last_used"] = datetime.now(timezone.utc).isoformat()
+                    self.save()
+                    return remote_file
+                except openai.NotFoundError:
+                    del self.files[digest]  # Deleted outside of this registry
+
+            with open(file_path, "rb") as f:
+                remote_file = self.client.files.create(file=f, purpose=purpose)
+            now = datetime.now(timezone.utc).isoformat()
+            self.files[digest] = {"file_id": remote_file.id, "registered_at": now, "last_used": now}
+            self._collect_garbage()
+            self.save()
+            return remote_file
+
+    # The assistant created with exactly these assistants.create arguments, creating it if needed
+    def assistant(self, **config):
+        digest = _config_sha256(config)
+        with self._lock:
+            entry = self.assistants.get(digest)
+            if entry is not None:
+                try:
+                    remote_assistant = self.client.beta.assistants.retrieve(entry["assistant_id"])
+                    entry["last_used"] = datetime.now(timezone.utc).isoformat()
+                    self.save()
+                    return remote_assistant
+                except openai.NotFoundError:
+                    del self.assistants[digest]
+
+            remote_assistant = self.client.beta.assistants.create(**config)
+            file_ids = config.get("tool_resources", {}).get("code_interpreter", {}).get("file_ids", [])
+            now = datetime.now(timezone.utc).isoformat()
+            self.assistants[digest] = {
+                "assistant_id": remote_assistant.id,
+                "file_ids": file_ids,
+                "registered_at": now,
+                "last_used": now,
+            }
+            self._collect_garbage()
+            self.save()
+            return remote_assistant
+
+    def _delete_remote(self, delete, remote_id: str) -> None:
+        try:
+            delete(remote_id)
+        except openai.NotFoundError:
+            pass  # Already gone
+
+    # Keep the keep_versions most recently used files and, for each set of kept files (or none),
+    # the keep_versions most recently used assistants. Anything used within the grace period is kept as
+    # well, however many newer versions there are. Returns the number of remote objects deleted.
+    def _collect_garbage(self) -> int:
+        def newest_first(entries):
+            return sorted(entries.items(), key=lambda item: item[1]["last_used"], reverse=True)
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)).isoformat()
+
+        def in_grace(entry):
+            return entry["last_used"] > cutoff
+
+        # A file is in use for as long as an assistant built on it is
+        used_file_ids = {file_id for entry in self.assistants.values() if in_grace(entry) for file_id in entry["file_ids"]}
+        stale_files = [
+            (digest, entry) for digest, entry in newest_first(self.files)[self.keep_versions:]
+            if not in_grace(entry) and entry["file_id"] not in used_file_ids
+        ]
+        for digest, entry in stale_files:
+            self._delete_remote(self.client.files.delete, entry["file_id"])
+            del self.files[digest]
+        kept_file_ids = {entry["file_id"] for entry in self.files.values()}
+
+        stale_assistants = []
+        kept_per_files: Dict[tuple, int] = {}
+        for digest, entry in newest_first(self.assistants):
+            file_ids = tuple(sorted(entry["file_ids"]))
+            kept_per_files[file_ids] = kept_per_files.get(file_ids, 0) + 1
+            if in_grace(entry):
+                continue
+            if not set(file_ids) <= kept_file_ids or kept_per_files[file_ids] > self.keep_versions:
+                stale_assistants.append((digest, entry))
+        for digest, entry in stale_assistants:
+            self._delete_remote(self.client.beta.assistants.delete, entry["assistant_id"])
+            del self.assistants[digest]
+        return len(stale_files) + len(stale_assistants)
+
+    def collect_garbage(self) -> int:
+        with self._lock:
+            deleted = self._collect_garbage()
+            self.save()
+            return deleted
@@ -0,0 +1,130 @@
+# batch_predict_category.py
+# Usage: python batch_predict_category.py students.csv predictions.csv [--chunksize 100000] [--workers 4]
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from category_model import FEATURE_COLUMNS, encode_features, load_category_model, recommend_books
+from features import feature_categories
+
+ID_COLUMN = "Student ID"
+UNKNOWN_CATEGORY = ""
+# Chunks read ahead per worker; only this many chunks and their results are in memory at once
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+_worker_artifact: Optional[dict] = None
+
+
+# Predict every distinct feature combination of a chunk once and broadcast the result to its rows.
+# A roster has only a few hundred combinations, so the model sees a few rows instead of the whole chunk.
+def predict_chunk(artifact: dict, chunk: pd.DataFrame, top_books: int = 3) -> pd.DataFrame:
+    X, valid = encode_features(artifact, chunk)
+    combinations, inverse = np.unique(X, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    known = (combinations >= 0).all(axis=1)
+
+    categories = np.full(len(combinations), UNKNOWN_CATEGORY, dtype=object)
+    if known.any():
+        predicted = artifact["model"].predict(combinations[known])
+        categories[known] = artifact["label_encoder"].inverse_transform(predicted)
+
+    # Books are ranked for the student's degree, which is part of every combination
+    degree_column = FEATURE_COLUMNS.index("Degree")
+    degrees = feature_categories(artifact["features"])["Degree"]
+    books = np.empty(len(combinations), dtype=object)
+    for row, (category, codes) in enumerate(zip(categories, combinations)):
+        degree = degrees[codes[degree_column]] if codes[degree_column] >= 0 else None
+        books[row] = "; ".join(recommend_books(artifact, category, degree, top_books))
+
+    result = pd.DataFrame({"Predicted Category": categories[inverse]}, index=chunk.index)
+    if ID_COLUMN in chunk:
+        result.insert(0, ID_COLUMN, chunk[ID_COLUMN])
+    result["Recommended Books"] = books[inverse]
+    result["Valid Input"] = valid
+    return result
+
+
+def _init_worker(artifact: dict) -> None:
+    global _worker_artifact
+    _worker_artifact = artifact
+
+
+def _predict_in_worker(job: Tuple[pd.DataFrame, int]) -> pd.DataFrame:
+    chunk, top_books = job
+    return predict_chunk(_worker_artifact, chunk, top_books)
+
+
+# Results of the chunks in input order, reading a chunk only when one of the in-flight chunks is done.
+# Executor.map would read the whole CSV up front, since it submits every chunk before yielding any.
+def _predict_in_pool(
+    pool: ProcessPoolExecutor, chunks: Iterable[pd.DataFrame], top_books: int, in_flight: int
+) -> Iterator[pd.DataFrame]:
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_predict_in_worker, (chunk, top_books)))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _read_roster(input_csv: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    header = pd.read_csv(input_csv, nrows=0).columns
+    columns = [column for column in [ID_COLUMN] + FEATURE_COLUMNS if column in header]
+    return pd.read_csv(input_csv, usecols=columns, dtype={column: "category" for column in FEATURE_COLUMNS}, chunksize=chunksize)
+
+
+# Stream a student CSV of any size through the model, writing predictions chunk by chunk.
+# Returns (rows written, seconds taken).
+def predict_csv(
+    input_csv: str,
+    output_csv: str,
+    chunksize: int = 100_000,
+    workers: int = 1,
+    top_books: int = 3,
+    artifact: Optional[dict] = None,
+) -> Tuple[int, float]:
+    start = time.perf_counter()
+    chunks = _read_roster(input_csv, chunksize)
+    # Loaded, or trained and saved, once here so the workers never each run the grid search
+    artifact = artifact if artifact is not None else load_category_model()
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(artifact,))
+        results = _predict_in_pool(pool, chunks, top_books, workers * CHUNKS_IN_FLIGHT_PER_WORKER)
+    else:
+        pool = None
+        results = (predict_chunk(artifact, chunk, top_books) for chunk in chunks)
+
+    rows = 0
+    try:
+        with open(output_csv, "w", encoding="utf-8", newline="") as f:
+            for result in results:
+                result.to_csv(f, header=rows == 0, index=False)
+                rows += len(result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict book categories for every student in a CSV.")
+    parser.add_argument("input_csv")
+    parser.add_argument("output_csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--top-books", type=int, default=3)
+    args = parser.parse_args()
+
+    rows, seconds = predict_csv(args.input_csv, args.output_csv, args.chunksize, args.workers, args.top_books)
+    print(f"Predicted {rows} students in {seconds:.2f}s ({rows / seconds:,.0f} rows/s), written to {args.output_csv}")
+
+
+if __name__ == "__main__":
+    main()
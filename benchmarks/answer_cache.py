@@ -0,0 +1,102 @@
+# benchmarks/answer_cache.py
+# Usage: python -m benchmarks.answer_cache [--questions 200] [--distinct 30]
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import warnings
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # config.py builds a client at import time
+
+from openai import OpenAI
+
+from answer_cache import AnswerCache
+from benchmarks.mock_assistant_api import MockAssistantAPI, serve_mock_api
+from chat_app import stream_assistant_response
+from retrieval import HashingEmbedder
+
+TOPICS = ["Kur është afati i aplikimit për", "Sa kushton studimi në", "Ku e gjej orarin e provimeve të", "A ka bursa për studentët e", "Cilat lëndë zgjedhore ofron", "Kush është dekani i"]
+FACULTIES = ["Shkenca Kompjuterike", "Arkitekturë dhe Planifikim Hapësinor", "Drejtësi", "Menaxhment, Biznes dhe Ekonomi", "Mjekësi Dentare"]
+
+
+# Questions with a Zipf-like popularity, a few of them written without diacritics or in upper case
+def _workload(questions, distinct, seed=7):
+    rng = random.Random(seed)
+    pool = [f"{topic} {faculty}?" for topic in TOPICS for faculty in FACULTIES][:distinct]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    workload = []
+    for question in rng.choices(pool, weights, k=questions):
+        variant = rng.random()
+        if variant < 0.1:
+            question = question.upper()
+        elif variant < 0.2:
+            question = question.replace("ë", "e")
+        workload.append(question)
+    return workload
+
+
+def _answer(client, cache, question, corpus_version):
+    if cache is not None:
+        cached = cache.get(question, corpus_version)
+        if cached is not None:
+            return cached
+    started = time.perf_counter()
+    thread_id = client.beta.threads.create().id
+    answer = "".join(stream_assistant_response(client, "asst_mock", thread_id, question))
+    if cache is not None:
+        cache.put(question, answer, corpus_version, time.perf_counter() - started)
+    return answer
+
+
+def main():
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # The Assistants API is marked deprecated
+    parser = argparse.ArgumentParser(description="Replay repeated chat questions with and without the answer cache.")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=len(TOPICS) * len(FACULTIES))
+    parser.add_argument("--first-token-ms", type=float, default=100)
+    parser.add_argument("--token-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    api = MockAssistantAPI(first_token_delay=args.first_token_ms / 1000, token_delay=args.token_ms / 1000)
+    server, base_url = serve_mock_api(api)
+    client = OpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    workload = _workload(args.questions, args.distinct)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"{'mode':>16} {'runs':>6} {'mean ms':>8} {'p50 ms':>7} {'hit rate':>9}")
+            for mode, cache in [
+                ("no cache", None),
+                ("exact match", AnswerCache(os.path.join(tmp, "exact.json"))),
+                ("exact + similar", AnswerCache(os.path.join(tmp, "similar.json"), embedder=HashingEmbedder())),
+            ]:
+                api.reset_counters()
+                latencies = []
+                for question in workload:
+                    start = time.perf_counter()
+                    _answer(client, cache, question, "corpus-v1")
+                    latencies.append((time.perf_counter() - start) * 1000)
+                runs = sum(1 for method, path in api.request_log if method == "POST" and path.endswith("/runs"))
+                hit_rate = f"{cache.stats.hit_rate():.0%}" if cache is not None else "-"
+                print(
+                    f"{mode:>16} {runs:>6} {statistics.mean(latencies):>8.1f} "
+                    f"{statistics.median(latencies):>7.1f} {hit_rate:>9}"
+                )
+
+            # Questions about a new crawl miss, while sessions still on the old crawl keep their hits
+            cache = AnswerCache(os.path.join(tmp, "exact.json"))
+            new_crawl = cache.get(workload[0], "corpus-v2")
+            old_crawl = cache.get(workload[0], "corpus-v1")
+            print(
+                f"Reloaded cache: {len(cache)} entries; new crawl: {'hit' if new_crawl else 'miss'}, "
+                f"old crawl: {'hit' if old_crawl else 'miss'}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
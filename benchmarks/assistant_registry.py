@@ -0,0 +1,82 @@
+# benchmarks/assistant_registry.py
+# Usage: python -m benchmarks.assistant_registry [--restarts 5] [--corpus data/output.txt]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+from openai import OpenAI
+
+from assistant_registry import AssistantRegistry
+from benchmarks.mock_assistant_api import MockAssistantAPI, serve_mock_api
+
+ASSISTANT_CONFIG = {"name": "UBT assistant", "instructions": "Answer from output.txt.", "model": "gpt-4o-mini"}
+
+
+def _file_config(file_id):
+    return dict(
+        ASSISTANT_CONFIG,
+        tools=[{"type": "code_interpreter"}],
+        tool_resources={"code_interpreter": {"file_ids": [file_id]}},
+    )
+
+
+# What app.py did before: st.cache_resource is empty after every restart, so both are created again
+def _legacy_setup(client, corpus_file, registry_path):
+    with open(corpus_file, "rb") as f:
+        remote_file = client.files.create(file=f, purpose="assistants")
+    return client.beta.assistants.create(**_file_config(remote_file.id))
+
+
+def _registry_setup(client, corpus_file, registry_path):
+    registry = AssistantRegistry(client, registry_path)
+    remote_file = registry.upload_file(corpus_file)
+    return registry.assistant(**_file_config(remote_file.id))
+
+
+def main():
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # The Assistants API is marked deprecated
+    parser = argparse.ArgumentParser(description="Count uploads and leftover objects across app restarts and re-crawls.")
+    parser.add_argument("--restarts", type=int, default=5)
+    parser.add_argument("--corpus", default="data/output.txt")
+    args = parser.parse_args()
+
+    api = MockAssistantAPI()
+    server, base_url = serve_mock_api(api)
+    client = OpenAI(base_url=base_url, api_key="mock", max_retries=0)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus_file = os.path.join(tmp, "output.txt")
+            print(f"{'mode':>9} {'uploads':>8} {'KiB uploaded':>13} {'requests':>9} {'ms/start':>9} {'files left':>11} {'assistants left':>16}")
+            for mode, setup in [("legacy", _legacy_setup), ("registry", _registry_setup)]:
+                shutil.copyfile(args.corpus, corpus_file)
+                registry_path = os.path.join(tmp, f"{mode}_registry.json")
+                api.files.clear()
+                api.assistants.clear()
+                api.bytes_uploaded = 0
+                api.reset_counters()
+
+                start = time.perf_counter()
+                for restart in range(args.restarts):
+                    if restart == args.restarts - 1:
+                        # The last start follows a re-crawl that changed the corpus
+                        with open(corpus_file, "a", encoding="utf-8") as f:
+                            f.write("Content:\nNjë faqe e re.\n" + "=" * 80 + "\n")
+                    setup(client, corpus_file, registry_path)
+                elapsed = (time.perf_counter() - start) / args.restarts * 1000
+
+                uploads = sum(1 for method, path in api.request_log if method == "POST" and path == "/v1/files")
+                print(
+                    f"{mode:>9} {uploads:>8} {api.bytes_uploaded / 1024:>13.0f} {api.request_count:>9} "
+                    f"{elapsed:>9.1f} {len(api.files):>11} {len(api.assistants):>16}"
+                )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/batch_prediction.py
+# Usage: python -m benchmarks.batch_prediction [--sizes 10000 100000 1000000] [--workers 1 2]
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_predict_category import predict_csv
+from category_model import FEATURE_COLUMNS, load_category_model, predict_categories
+from features import feature_categories
+
+
+# A roster drawn from the trained values, with a few rows the encoders have never seen
+def write_roster(path, rows, options, seed=11):
+    rng = np.random.default_rng(seed)
+    columns = {"Student ID": [f"S{i:07d}" for i in range(rows)]}
+    for column in FEATURE_COLUMNS:
+        values = np.array(options[column] + [f"Unknown {column}"], dtype=object)
+        weights = np.full(len(values), 0.999 / (len(values) - 1))
+        weights[-1] = 0.001
+        columns[column] = values[rng.choice(len(values), size=rows, p=weights)]
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+# The single-student form: a one-row DataFrame encoded and predicted per student
+def legacy_rows_per_second(artifact, roster_csv, sample=500):
+    roster = pd.read_csv(roster_csv, nrows=sample * 2)
+    categories = feature_categories(artifact["features"])
+    known = np.ones(len(roster), dtype=bool)
+    for column in FEATURE_COLUMNS:
+        known &= roster[column].isin(categories[column]).to_numpy()
+    roster = roster[known].head(sample)
+
+    start = time.perf_counter()
+    for _, student in roster.iterrows():
+        input_df = pd.DataFrame({column: [student[column]] for column in FEATURE_COLUMNS})
+        predict_categories(artifact, input_df)
+    return len(roster) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch category prediction throughput.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    artifact = load_category_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'students':>10} {'mode':>14} {'rows/s':>12} {'seconds':>8}")
+        for size in args.sizes:
+            roster_csv = os.path.join(tmp, f"roster_{size}.csv")
+            write_roster(roster_csv, size, artifact["options"])
+            if size == args.sizes[0]:
+                legacy = legacy_rows_per_second(artifact, roster_csv)
+                print(f"{size:>10} {'per student':>14} {legacy:>12,.0f} {size / legacy:>8.1f}  (extrapolated)")
+            for workers in args.workers:
+                rows, seconds = predict_csv(
+                    roster_csv, os.path.join(tmp, "predictions.csv"), args.chunksize, workers, artifact=artifact
+                )
+                assert rows == size
+                print(f"{size:>10} {f'batch x{workers}':>14} {rows / seconds:>12,.0f} {seconds:>8.2f}")
+            os.remove(roster_csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/books_reading.py
+# Usage: python -m benchmarks.books_reading [--pairs 1000000] [--max-books 5]
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from cluster_model import book_incidence, books_reading
+from library_data import BOOK_CSV
+
+
+# Students reading 1 to max_books catalogue books each (a few IDs unknown to the catalogue),
+# until there are about `pairs` student-book rows
+def synthetic_roster(pairs, max_books, seed=42):
+    rng = np.random.default_rng(seed)
+    catalogue = pd.read_csv(BOOK_CSV)["Book ID"].to_numpy()
+    ids = np.concatenate([catalogue, ["B999"]])
+    counts = rng.integers(1, max_books + 1, size=int(pairs / ((1 + max_books) / 2)))
+    picks = ids[rng.integers(0, len(ids), size=counts.sum())]
+    ends = np.cumsum(counts)
+    lists = [", ".join(picks[end - count:end]) for end, count in zip(ends, counts)]
+    return pd.DataFrame({"E-Library Book ID": lists}), int(counts.sum())
+
+
+# What DataPreprocessor.preprocess did: a lambda per row with a dict lookup per book
+def books_reading_legacy(student_df, book_df):
+    book_id_to_name = dict(zip(book_df['Book ID'], book_df['Name']))
+    return student_df['E-Library Book ID'].apply(
+        lambda x: ', '.join([book_id_to_name.get(book_id.strip(), 'Unknown') for book_id in str(x).split(',')])
+    )
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Books Reading and book features: per-row lambda vs vectorized.")
+    parser.add_argument("--pairs", type=int, default=1_000_000, help="Approximate student-book rows")
+    parser.add_argument("--max-books", type=int, default=5)
+    args = parser.parse_args()
+
+    book_df = pd.read_csv(BOOK_CSV)
+    student_df, pairs = synthetic_roster(args.pairs, args.max_books)
+    print(f"{len(student_df):,} students, {pairs:,} student-book rows, {student_df['E-Library Book ID'].nunique():,} distinct lists")
+
+    legacy, legacy_seconds = _timed(lambda: books_reading_legacy(student_df, book_df))
+    current, current_seconds = _timed(lambda: books_reading(student_df, book_df))
+    print(f"Books Reading:  per-row lambda {legacy_seconds:6.2f}s, vectorized {current_seconds:6.2f}s, "
+          f"identical: {legacy.tolist() == current.tolist()}")
+
+    tokens, tokens_seconds = _timed(lambda: CountVectorizer(dtype=np.float32).fit_transform(legacy))
+    incidence, incidence_seconds = _timed(lambda: book_incidence(student_df, book_df['Book ID']))
+    print(f"Book features:  CountVectorizer on names {tokens_seconds:6.2f}s ({tokens.shape[1]} terms), "
+          f"incidence matrix {incidence_seconds:6.2f}s ({incidence.shape[1]} books, {int(incidence.sum()):,} known pairs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/chat_latency.py
+# Usage: python -m benchmarks.chat_latency [--turns 5] [--first-token-ms 300]
+
+import argparse
+import os
+import statistics
+import time
+import warnings
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # config.py builds a client at import time
+
+from openai import OpenAI
+
+from benchmarks.mock_assistant_api import MockAssistantAPI, serve_mock_api
+from chat_app import poll_assistant_response, stream_assistant_response
+
+
+def _new_thread(client, question):
+    thread = client.beta.threads.create()
+    client.beta.threads.messages.create(thread_id=thread.id, role="user", content=question)
+    return thread.id
+
+
+# The fixed two-second polling loop get_gpt4_response used before streaming
+def _legacy_response(client, assistant_id, thread_id):
+    run = client.beta.threads.runs.create(thread_id=thread_id, assistant_id=assistant_id)
+    while run.status in ["queued", "in_progress"]:
+        time.sleep(2)
+        run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+    messages = client.beta.threads.messages.list(thread_id=thread_id)
+    yield next(msg for msg in messages.data if msg.role == "assistant").content[0].text.value
+
+
+def _polling_response(client, assistant_id, thread_id):
+    yield poll_assistant_response(client, assistant_id, thread_id)
+
+
+# Time to first token and end-to-end latency of one answer, in seconds
+def _measure(client, respond):
+    start = time.perf_counter()
+    thread_id = _new_thread(client, "Kur është afati i aplikimit?")
+    first_token = None
+    answer = ""
+    for text in respond(client, "asst_mock", thread_id):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        answer += text
+    return first_token, time.perf_counter() - start, answer
+
+
+def main():
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # The Assistants API is marked deprecated
+    parser = argparse.ArgumentParser(description="Compare chat response latency against a mock Assistants API.")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    api = MockAssistantAPI(first_token_delay=args.first_token_ms / 1000, token_delay=args.token_ms / 1000)
+    server, base_url = serve_mock_api(api)
+    client = OpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    print(f"Mock run: first token after {args.first_token_ms:.0f} ms, {api.run_duration * 1000:.0f} ms in total")
+
+    try:
+        print(f"{'mode':>22} {'TTFT ms':>9} {'end-to-end ms':>14}")
+        for mode, respond in [
+            ("fixed 2 s polling", _legacy_response),
+            ("backoff polling", _polling_response),
+            ("streaming", stream_assistant_response),
+        ]:
+            results = [_measure(client, respond) for _ in range(args.turns)]
+            assert all(answer == "".join(api.tokens) for _, _, answer in results)
+            ttft = statistics.median(first for first, _, _ in results) * 1000
+            total = statistics.median(total for _, total, _ in results) * 1000
+            print(f"{mode:>22} {ttft:>9.0f} {total:>14.0f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
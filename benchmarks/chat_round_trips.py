@@ -0,0 +1,63 @@
+# benchmarks/chat_round_trips.py
+# Usage: python -m benchmarks.chat_round_trips [--turns 10]
+
+import argparse
+import os
+import time
+import warnings
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # config.py builds a client at import time
+
+from openai import DefaultHttpxClient, OpenAI
+
+from benchmarks.mock_assistant_api import MockAssistantAPI, serve_mock_api
+from chat_app import get_session_thread, stream_assistant_response
+
+
+# One thread per question and a separate request for the message, as run_chatbot used to do
+def _new_thread_turn(client, session_state, question):
+    thread = client.beta.threads.create()
+    client.beta.threads.messages.create(thread_id=thread.id, role="user", content=question)
+    return "".join(stream_assistant_response(client, "asst_mock", thread.id))
+
+
+# The session's thread, with the question sent along with the run
+def _session_thread_turn(client, session_state, question):
+    thread_id = get_session_thread(client, session_state)
+    session_state["thread_messages"] += 2
+    return "".join(stream_assistant_response(client, "asst_mock", thread_id, question))
+
+
+def main():
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # The Assistants API is marked deprecated
+    parser = argparse.ArgumentParser(description="Count API round trips per chat turn against a mock Assistants API.")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    api = MockAssistantAPI(first_token_delay=args.first_token_ms / 1000, token_delay=args.token_ms / 1000)
+    server, base_url = serve_mock_api(api)
+    try:
+        print(f"{'mode':>24} {'requests/turn':>14} {'ms/turn':>8} {'threads left':>13}")
+        for mode, turn, http_client in [
+            ("new thread, new client", _new_thread_turn, None),
+            ("session thread, pooled", _session_thread_turn, DefaultHttpxClient()),
+        ]:
+            api.reset_counters()
+            api.threads.clear()
+            session_state = {}
+            start = time.perf_counter()
+            for number in range(args.turns):
+                # Without a shared http_client every turn pays for a fresh connection pool
+                client = OpenAI(base_url=base_url, api_key="mock", max_retries=0, http_client=http_client)
+                answer = turn(client, session_state, f"Pyetja {number}: kur është afati i aplikimit?")
+                assert answer == "".join(api.tokens)
+            elapsed = (time.perf_counter() - start) / args.turns * 1000
+            print(f"{mode:>24} {api.request_count / args.turns:>14.1f} {elapsed:>8.0f} {len(api.threads):>13}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
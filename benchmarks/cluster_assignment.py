@@ -0,0 +1,53 @@
+# benchmarks/cluster_assignment.py
+# Usage: python -m benchmarks.cluster_assignment [--students 200 10000 100000]
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from cluster_model import (
+    encode_students, load_cluster_model, load_roster, predict_clusters, refit_cluster_model, save_cluster_model,
+)
+from library_data import BOOK_CSV
+from student_clustering_dashboard import KMeansModel, StudentClusterer
+
+
+def _timed(function, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clustering cost of one dashboard page view: refit vs persisted model.")
+    parser.add_argument("--students", type=int, nargs="+", default=[200, 10_000, 100_000])
+    args = parser.parse_args()
+
+    template = load_roster()
+    catalogue = pd.read_csv(BOOK_CSV)['Book ID']
+    print(f"{'students':>10} {'refit per view':>15} {'load + predict':>15} {'predict only':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "student_clusters.joblib")
+        for students in args.students:
+            roster = template.iloc[np.resize(np.arange(len(template)), students)].reset_index(drop=True)
+            save_cluster_model(refit_cluster_model(roster, catalogue), path)
+            artifact = load_cluster_model(path)
+            encoded = encode_students(artifact["features"], roster)
+
+            # What every page view did before: fit KMeans on the whole table
+            KMeansModel._instance = None
+            refit = _timed(lambda: StudentClusterer(encoded.copy(), None).cluster())
+            load_and_predict = _timed(lambda: predict_clusters(load_cluster_model(path), encoded))
+            predict = _timed(lambda: predict_clusters(artifact, encoded))
+            print(f"{students:>10,} {refit * 1000:>12.1f} ms {load_and_predict * 1000:>12.1f} ms {predict * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
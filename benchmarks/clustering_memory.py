@@ -0,0 +1,86 @@
+# benchmarks/clustering_memory.py
+# Usage: python -m benchmarks.clustering_memory [--students 10000 100000 1000000] [--books 2000] [--memory-limit-gib 4]
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from cluster_model import books_reading
+from library_data import BOOK_CSV
+from student_clustering_dashboard import SPARSE_BATCH_SIZE, StudentClusterer
+
+MODES = {"dense": False, "sparse": True}
+
+
+# A preprocessed roster: encoded Degree/Faculty/Status and one to three books per student, with the
+# catalogue they come from. The catalogue titles get a volume word each, so the vocabulary of the
+# dense path grows to about `books` terms.
+def synthetic_students(students, books, seed=42):
+    rng = np.random.default_rng(seed)
+    names = pd.read_csv(BOOK_CSV)["Name"].to_numpy()
+    book_df = pd.DataFrame({
+        "Book ID": [f"B{i:05d}" for i in range(books)],
+        "Name": [f"{names[i % len(names)]} vol{i}" for i in range(books)],
+    })
+    reading = rng.integers(0, books, size=(students, 3))
+    counts = rng.integers(1, 4, size=students)
+    book_ids = book_df["Book ID"].to_numpy()
+    student_df = pd.DataFrame({
+        "Degree": rng.integers(0, 12, size=students),
+        "Faculty": rng.integers(0, 5, size=students),
+        "Status": rng.integers(0, 2, size=students),
+        "E-Library Book ID": [",".join(book_ids[row[:count]]) for row, count in zip(reading, counts)],
+    })
+    student_df["Books Reading"] = books_reading(student_df, book_df)
+    return student_df, book_df
+
+
+# Runs one mode in this process and prints fit seconds and peak RSS in MiB
+def _measure(mode, students, books, batch_size):
+    student_df, book_df = synthetic_students(students, books)
+    start = time.perf_counter()
+    StudentClusterer(student_df, book_df, sparse_features=MODES[mode], batch_size=batch_size).cluster()
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}")
+
+
+def _limit_memory(limit_bytes):
+    return lambda: resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory and fit time of the dense and sparse clustering paths.")
+    parser.add_argument("--students", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--books", type=int, default=2000, help="Distinct book titles, about the vocabulary size")
+    parser.add_argument("--batch-size", type=int, default=SPARSE_BATCH_SIZE)
+    parser.add_argument("--memory-limit-gib", type=float, default=4.0, help="Address-space limit of each run")
+    parser.add_argument("--measure", nargs=4, metavar=("MODE", "STUDENTS", "BOOKS", "BATCH_SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        mode, students, books, batch_size = args.measure
+        return _measure(mode, int(students), int(books), int(batch_size))
+
+    print(f"{args.books} book titles, memory limit {args.memory_limit_gib:g} GiB per run")
+    print(f"{'students':>10} {'mode':>7} {'fit seconds':>12} {'peak RSS MiB':>13}")
+    for students in args.students:
+        for mode in MODES:
+            # A fresh process per run, so peak memory is not inherited from an earlier run
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.clustering_memory", "--measure",
+                 mode, str(students), str(args.books), str(args.batch_size)],
+                capture_output=True, text=True, preexec_fn=_limit_memory(int(args.memory_limit_gib * 1024 ** 3)),
+            )
+            if completed.returncode != 0:
+                print(f"{students:>10,} {mode:>7} {'out of memory' if 'MemoryError' in completed.stderr else 'failed':>12}")
+                continue
+            seconds, peak = (float(value) for value in completed.stdout.split())
+            print(f"{students:>10,} {mode:>7} {seconds:>12.2f} {peak:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/crawl_concurrency.py
+# Usage: python -m benchmarks.crawl_concurrency [--pages 200] [--delay-ms 50] [--tiers http browser]
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.fixture_site import build_fixture_site, serve_directory
+from scraper import BROWSER_TIER, HTTP_TIER, crawl_links
+
+# browser_url_patterns of each run: the tiered fetcher as it crawls, and every page through the shared browser
+TIERS = {HTTP_TIER: None, BROWSER_TIER: [".*"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure crawl throughput at different concurrency levels.")
+    parser.add_argument("--pages", type=int, default=200, help="Number of pages in the fixture site")
+    parser.add_argument("--delay-ms", type=float, default=50, help="Artificial server latency per request")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels to test")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=list(TIERS), help="Fetch tiers to test")
+    args = parser.parse_args()
+
+    site_root = build_fixture_site(num_pages=args.pages)
+    out_dir = tempfile.mkdtemp(prefix="ubt_bench_")
+    server, base_url = serve_directory(site_root, delay=args.delay_ms / 1000)
+
+    try:
+        print(f"Fixture site: {args.pages} pages at {base_url} ({args.delay_ms:.0f} ms latency)")
+        print(f"{'tier':>8} {'concurrency':>12} {'pages':>8} {'seconds':>10} {'pages/s':>10}")
+        for tier in args.tiers:
+            for level in args.levels:
+                output_file = os.path.join(out_dir, f"output_{tier}_{level}.json")
+                start = time.perf_counter()
+                scraped = asyncio.run(crawl_links(
+                    base_url, set(), args.pages, output_file, concurrency=level, browser_url_patterns=TIERS[tier],
+                ))
+                elapsed = time.perf_counter() - start
+                print(f"{tier:>8} {level:>12} {len(scraped):>8} {elapsed:>10.2f} {len(scraped) / elapsed:>10.2f}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(site_root, ignore_errors=True)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/dashboard_payload.py
+# Usage: python -m benchmarks.dashboard_payload [--students 100000]
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.subject_loading import write_roster
+from library_data import BOOK_CSV
+from student_clustering_dashboard import get_dashboard
+
+
+# The dashboard as it rendered before search and pagination: every student in the selectbox,
+# every cluster in full
+def legacy_app(student_csv, book_csv):
+    import streamlit as st
+    from student_clustering_dashboard import get_dashboard, source_versions
+
+    dashboard = get_dashboard(student_csv, book_csv, source_versions(student_csv, book_csv))
+    selected = st.sidebar.selectbox("Select a student:", dashboard.student_ids, format_func=dashboard.student_names.get)
+    st.markdown(f"**Degree Program:** {dashboard.profiles.loc[selected]['Degree']}")
+    for cluster_id, group in dashboard.clusters.items():
+        with st.expander(f"{dashboard.cluster_to_group[cluster_id].value} ({len(group)} Students)"):
+            st.dataframe(group)
+
+
+def current_app(student_csv, book_csv):
+    from student_clustering_dashboard import main
+
+    main(student_csv, book_csv)
+
+
+# Size of everything the run sent to the browser, as serialized protobuf messages
+def payload_bytes(node):
+    total = node.proto.ByteSize() if getattr(node, "proto", None) is not None else 0
+    for child in getattr(node, "children", {}).values():
+        total += payload_bytes(child)
+    return total
+
+
+def _run(app):
+    start = time.perf_counter()
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload and time to interactive of the clustering dashboard.")
+    parser.add_argument("--students", type=int, default=100_000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        student_csv = os.path.join(tmp, "students.csv")
+        write_roster(student_csv, args.students)
+        print(f"{args.students:,} students")
+        # Fills the on-disk caches (roster, feature pipeline, cluster model) the first load would otherwise pay for
+        _run(AppTest.from_function(legacy_app, args=(student_csv, BOOK_CSV), default_timeout=600))
+        print(f"{'dashboard':>10} {'first load':>11} {'rerun':>9} {'payload':>11}")
+        for label, function in [("legacy", legacy_app), ("current", current_app)]:
+            app = AppTest.from_function(function, args=(student_csv, BOOK_CSV), default_timeout=600)
+            # The first load builds the cached dashboard; cleared so both versions pay for it
+            get_dashboard.clear()
+            first = _run(app)
+            if app.sidebar.text_input:
+                app.sidebar.text_input[0].input("henry")
+            else:
+                app.sidebar.selectbox[0].set_value("S0000001")  # IDs from write_roster
+            rerun = _run(app)
+            print(f"{label:>10} {first:>9.2f} s {rerun:>7.2f} s {payload_bytes(app._tree) / 1024:>7,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/dashboard_render.py
+# Usage: python -m benchmarks.dashboard_render [--students 1000 10000 100000]
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cluster_model import cluster_to_group, encode_students, load_roster
+from features import feature_categories, load_feature_pipeline
+from student_clustering_dashboard import ClusteringDashboard, DataPreprocessor
+
+
+# A clustered roster as main() builds it: the mock students repeated with fresh IDs, codes from the
+# shared pipeline and a cluster per student
+def clustered_students(students):
+    template = load_roster()
+    roster = template.iloc[np.resize(np.arange(len(template)), students)].reset_index(drop=True)
+    roster["Student ID"] = [f"S{i:07d}" for i in range(students)]
+    roster["Full Name"] = roster["First Name"] + " " + roster["Last Name"] + " " + roster["Student ID"]
+    features = load_feature_pipeline(roster)
+    clustered = encode_students(features, roster)
+    clustered["Cluster"] = np.random.default_rng(42).integers(0, len(cluster_to_group), size=students)
+
+    encoders = DataPreprocessor(None, None)
+    categories = feature_categories(features)
+    for column, encoder in (("Degree", encoders.degree_encoder), ("Faculty", encoders.faculty_encoder), ("Status", encoders.status_encoder)):
+        encoder.classes_ = categories[column]
+    return clustered, encoders
+
+
+# What ClusteringDashboard.run did on every rerun before the views were cached
+def run_legacy(student_df, degree_encoder, faculty_encoder):
+    st.set_page_config(page_title="Student Group Clustering Dashboard", layout="wide")
+    st.title("Student Group Clustering Dashboard")
+    selected_student_name = st.sidebar.selectbox("Select a student:", student_df['Full Name'].values)
+    selected_student = student_df[student_df['Full Name'] == selected_student_name].iloc[0]
+    st.markdown(f"**Degree Program:** {degree_encoder.inverse_transform([selected_student['Degree']])[0]}")
+    st.markdown(f"**Faculty:** {faculty_encoder.inverse_transform([selected_student['Faculty']])[0]}")
+    st.markdown(f"**Group:** {cluster_to_group[selected_student['Cluster']].value}")
+    for cluster_id, group in student_df.groupby('Cluster'):
+        with st.expander(f"{cluster_to_group[cluster_id].value} ({len(group)} Students)"):
+            group['Degree'] = group['Degree'].apply(lambda x: degree_encoder.inverse_transform([x])[0])
+            group['Faculty'] = group['Faculty'].apply(lambda x: faculty_encoder.inverse_transform([x])[0])
+            st.dataframe(group[['Full Name', 'Faculty', 'Degree', 'Books Reading']].reset_index(drop=True))
+
+
+def _timed(function, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rerun time of the clustering dashboard, run outside a Streamlit server.")
+    parser.add_argument("--students", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # Bare-mode warnings on every st call
+    pd.options.mode.chained_assignment = None  # The legacy path writes into groupby slices
+
+    print(f"{'students':>10} {'legacy rerun':>13} {'build views':>12} {'cached rerun':>13}")
+    for students in args.students:
+        clustered, encoders = clustered_students(students)
+        legacy = _timed(lambda: run_legacy(clustered, encoders.degree_encoder, encoders.faculty_encoder), repeat=1)
+        build = _timed(lambda: ClusteringDashboard(
+            clustered, encoders.degree_encoder, encoders.faculty_encoder, status_encoder=encoders.status_encoder,
+        ))
+        dashboard = ClusteringDashboard(
+            clustered, encoders.degree_encoder, encoders.faculty_encoder, status_encoder=encoders.status_encoder,
+        )
+        rerun = _timed(dashboard.run)
+        print(f"{students:>10,} {legacy * 1000:>10.0f} ms {build * 1000:>9.0f} ms {rerun * 1000:>10.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/document_ingestion.py
+# Usage: python -m benchmarks.document_ingestion [--documents 500] [--pages 4] [--workers 1 2 4] [--cache]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from file_handler import ExtractionCache, ExtractionCacheStats, extract_data_from_file, ingest_files, iter_ingested_pages
+
+WORDS = (
+    "universiteti studentët programi lënda semestri provimi kredite ECTS fakulteti "
+    "orari mësimi regjistrimi bursa afati planprogrami laboratori praktika diploma"
+).split()
+
+
+def _pdf_page_stream(lines):
+    commands = ["BT", "/F1 11 Tf", "14 TL", "50 780 Td"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        commands.append(f"({escaped}) Tj T*")
+    commands.append("ET")
+    return "\n".join(commands).encode("latin-1", "replace")
+
+
+# A minimal multi-page PDF with a Helvetica text layer, written by hand so no PDF library is needed
+def write_pdf(path, pages):
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        stream = _pdf_page_stream(lines)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+# Course handbooks of a few pages each, plus one broken file and one unsupported file
+def build_corpus(root, documents, pages, seed=3):
+    rng = random.Random(seed)
+    for index in range(documents):
+        content = [
+            [" ".join(rng.choices(WORDS, k=12)) for _ in range(40)]
+            for _ in range(pages)
+        ]
+        write_pdf(os.path.join(root, f"handbook_{index:04d}.pdf"), content)
+    with open(os.path.join(root, "broken.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4\nnot really a pdf")
+    with open(os.path.join(root, "notes.txt"), "w", encoding="utf-8") as f:
+        f.write("Shënime për studentët.\n" * 500)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Document ingestion throughput on a generated PDF corpus.")
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cache", action="store_true", help="Also time a cold and a warm run with the extraction cache")
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} CPUs available")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "corpus")
+        os.makedirs(corpus)
+        build_corpus(corpus, args.documents, args.pages)
+        paths = sorted(os.path.join(corpus, name) for name in os.listdir(corpus))
+
+        # One file at a time, as extract_data_from_file was used before
+        start = time.perf_counter()
+        failures = 0
+        for path in paths:
+            try:
+                extract_data_from_file(path)
+            except Exception:
+                failures += 1
+        sequential = time.perf_counter() - start
+        print(f"{'mode':>22} {'files/s':>8} {'pages/s':>8} {'seconds':>8} {'failed':>7}")
+        total_pages = args.documents * args.pages
+        print(f"{'sequential':>22} {len(paths) / sequential:>8.1f} {total_pages / sequential:>8.1f} {sequential:>8.2f} {failures:>7}")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = list(ingest_files(corpus, os.path.join(tmp, f"text_{workers}"), max_workers=workers))
+            pages = sum(1 for _ in iter_ingested_pages(results))
+            elapsed = time.perf_counter() - start
+            failed = [result for result in results if not result.ok]
+            print(
+                f"{f'process pool x{workers}':>22} {len(results) / elapsed:>8.1f} {pages / elapsed:>8.1f} "
+                f"{elapsed:>8.2f} {len(failed):>7}"
+            )
+        for result in failed:
+            print(f"  {os.path.basename(result.path)}: {result.error}")
+
+        if args.cache:
+            workers = max(args.workers)
+            cache = ExtractionCache(os.path.join(tmp, "extraction_cache"))
+            for run in ("cold cache", "warm cache"):
+                cache.stats = ExtractionCacheStats()
+                start = time.perf_counter()
+                results = list(ingest_files(corpus, os.path.join(tmp, "text_cached"), max_workers=workers, cache=cache))
+                pages = sum(1 for _ in iter_ingested_pages(results))
+                elapsed = time.perf_counter() - start
+                print(f"{run:>22} {len(results) / elapsed:>8.1f} {pages / elapsed:>8.1f} {elapsed:>8.2f}")
+                print(f"  {cache.stats.summary()}")
+            cached_size = sum(
+                os.path.getsize(os.path.join(cache.cache_dir, name)) for name in os.listdir(cache.cache_dir)
+            )
+            print(f"  {cached_size / 1024:.0f} KiB on disk for {pages} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/fixture_site.py
+
+import os
+import random
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>Page {page_id}</title></head>
+<body>
+<nav>{nav}</nav>
+<main>
+<h1>Page {page_id}</h1>
+{paragraphs}
+<ul>{links}</ul>
+</main>
+<footer>UBT fixture site</footer>
+</body>
+</html>
+"""
+
+
+# Generate a static site where every page links to a handful of random pages
+def build_fixture_site(num_pages=200, links_per_page=8, seed=42, root=None):
+    rng = random.Random(seed)
+    root = root or tempfile.mkdtemp(prefix="ubt_fixture_")
+    nav = " ".join(f'<a href="/page{i}.html">Menu {i}</a>' for i in range(5))
+
+    for page_id in range(num_pages):
+        targets = rng.sample(range(num_pages), min(links_per_page, num_pages))
+        links = "".join(f'<li><a href="/page{t}.html">Link to {t}</a></li>' for t in targets)
+        paragraphs = "\n".join(
+            f"<p>Paragraph {n} of page {page_id}. " + "Lorem ipsum dolor sit amet. " * 20 + "</p>"
+            for n in range(5)
+        )
+        html = PAGE_TEMPLATE.format(page_id=page_id, nav=nav, paragraphs=paragraphs, links=links)
+        with open(os.path.join(root, f"page{page_id}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+
+    # The crawl starts at the site root
+    os.replace(os.path.join(root, "page0.html"), os.path.join(root, "index.html"))
+    return root
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)  # Simulate network latency of a real server
+        if self.path == "/page0.html":
+            self.path = "/index.html"
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Serve a directory on localhost in a background thread, returns (server, base_url)
+def serve_directory(root, delay=0.0):
+    handler = type("FixtureHandler", (_QuietHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=root))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/"
@@ -0,0 +1,78 @@
+# benchmarks/html_extraction.py
+# Usage: python -m benchmarks.html_extraction [--input data/output.json] [--repeat 3]
+
+import argparse
+import html as html_lib
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+from html_extract import available_backends, extract_page
+
+MENU = " ".join(f'<li><a href="/sq/ubt/menu-{i}/">Menu item {i}</a></li>' for i in range(40))
+CHROME_TOP = (
+    "<!DOCTYPE html><html><head><title>UBT</title>"
+    "<style>body {{ font-family: sans-serif; }} .menu {{ display: flex; }}</style>"
+    "<script>window.dataLayer = window.dataLayer || []; function gtag() {{ dataLayer.push(arguments); }}</script>"
+    "</head><body><nav><ul class=\"menu\">{menu}</ul></nav><main>"
+)
+CHROME_BOTTOM = (
+    "</main><footer><p>UBT - Higher Education Institution</p><ul>{menu}</ul></footer>"
+    "<script src=\"/js/app.js\"></script></body></html>"
+)
+
+
+# output.json only stores page text, so each page is wrapped back into UBT-like HTML
+def _rebuild_pages(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    pages = []
+    for text in data.values():
+        paragraphs = "".join(f"<p>{html_lib.escape(line)}</p>\n" for line in text.splitlines() if line.strip())
+        pages.append(CHROME_TOP.format(menu=MENU) + paragraphs + CHROME_BOTTOM.format(menu=MENU))
+    return pages
+
+
+# What crawl_links did before: one html.parser pass for the text and another for the links
+def _legacy_extract(html):
+    text = BeautifulSoup(html, "html.parser").get_text(separator=" ").strip()
+    hrefs = [link["href"] for link in BeautifulSoup(html, "html.parser").find_all("a", href=True)]
+    return text, hrefs
+
+
+def _measure(pages, extract, repeat):
+    best = float("inf")
+    text_bytes = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text_bytes = sum(len(extract(page)[0].encode("utf-8")) for page in pages)
+        best = min(best, time.perf_counter() - start)
+    return best, text_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML-to-text extraction backends.")
+    parser.add_argument("--input", default="data/output.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = _rebuild_pages(args.input)
+    html_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    print(f"{len(pages)} pages, {html_bytes / 1024:.0f} KiB of HTML")
+    print(f"{'extractor':>22} {'seconds':>9} {'pages/s':>9} {'text KiB':>9}")
+
+    seconds, text_bytes = _measure(pages, _legacy_extract, args.repeat)
+    print(f"{'legacy (2x html.parser)':>22} {seconds:>9.3f} {len(pages) / seconds:>9.1f} {text_bytes / 1024:>9.0f}")
+
+    for backend in available_backends():
+        def extract(page, backend=backend):
+            extracted = extract_page(page, backend)
+            return extracted.text, extracted.hrefs
+
+        seconds, text_bytes = _measure(pages, extract, args.repeat)
+        print(f"{backend:>22} {seconds:>9.3f} {len(pages) / seconds:>9.1f} {text_bytes / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
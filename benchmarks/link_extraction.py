@@ -0,0 +1,85 @@
+# benchmarks/link_extraction.py
+# Usage: python -m benchmarks.link_extraction [--anchors 5000] [--frontier 50000]
+
+import argparse
+import time
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from frontier import Frontier
+from html_extract import extract_page
+from scraper import _find_internal_links, _queue_links, _url_is_file
+
+BASE_URL = "https://www.ubt-uni.net/sq/ubt/"
+
+
+# The list-based link extraction crawl_links used before the Frontier was introduced
+def _legacy_find_internal_links(current_url, html, base_domain, visited_links, exclude_links, queue, max_links):
+    internal_links = set()
+    soup = BeautifulSoup(html, "html.parser")
+    for link in soup.find_all("a", href=True):
+        if link["href"] in ["http://", "https://"]:
+            continue
+        absolute_link = urljoin(current_url, link["href"])
+        if base_domain != urlparse(absolute_link).netloc:
+            continue
+        if (
+            absolute_link not in visited_links
+            and absolute_link not in exclude_links
+            and absolute_link not in queue
+            and not _url_is_file(absolute_link)
+        ):
+            absolute_link = absolute_link.replace(" ", "%20")
+            queue.append(absolute_link)
+            internal_links.add(absolute_link)
+        if len(internal_links) == max_links:
+            break
+    return internal_links
+
+
+def _build_page(num_anchors):
+    # Half of the anchors point at pages that are already queued
+    anchors = "".join(
+        f'<a href="/sq/ubt/page{i * 2 if i % 2 else 100000 + i}/?utm_source=x#top">Link {i}</a>'
+        for i in range(num_anchors)
+    )
+    return f"<html><body>{anchors}</body></html>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare link extraction against a large frontier.")
+    parser.add_argument("--anchors", type=int, default=5000)
+    parser.add_argument("--frontier", type=int, default=50000)
+    args = parser.parse_args()
+
+    html = _build_page(args.anchors)
+    base_domain = urlparse(BASE_URL).netloc
+    queued_urls = [urljoin(BASE_URL, f"/sq/ubt/page{i}/") for i in range(args.frontier)]
+
+    queue = list(queued_urls)
+    start = time.perf_counter()
+    legacy_links = _legacy_find_internal_links(BASE_URL, html, base_domain, set(), set(), queue, args.anchors)
+    queue.extend(legacy_links)
+    while queue:
+        queue.pop(0)
+    legacy_seconds = time.perf_counter() - start
+
+    frontier = Frontier()
+    for queued_url in queued_urls:
+        frontier.add(queued_url)
+    start = time.perf_counter()
+    page_links = _find_internal_links(BASE_URL, extract_page(html, "html.parser").hrefs, base_domain)
+    new_links = _queue_links(frontier, page_links, 1, args.anchors)
+    while frontier:
+        frontier.pop()
+    frontier_seconds = time.perf_counter() - start
+
+    print(f"{args.anchors} anchors against a frontier of {args.frontier} URLs")
+    print(f"list queue: {legacy_seconds:8.3f} s, {len(legacy_links)} links queued")
+    print(f"Frontier:   {frontier_seconds:8.3f} s, {len(new_links)} links queued")
+    print(f"speedup:    {legacy_seconds / frontier_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# benchmarks/mock_assistant_api.py
+
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = (
+    "Universiteti UBT ofron programe bachelor dhe master në shumë fusha. "
+    "Afati i aplikimit për vitin akademik është i hapur deri në fund të shtatorit."
+)
+
+
+# Replays canned Assistants API behaviour: files, assistants, threads, messages and runs that take a fixed time.
+# A run produces its first token after first_token_delay and one more every token_delay.
+class MockAssistantAPI:
+    def __init__(self, answer=DEFAULT_ANSWER, first_token_delay=0.3, token_delay=0.02, words_per_token=1):
+        words = answer.split(" ")
+        self.tokens = [
+            " ".join(words[i:i + words_per_token]) + (" " if i + words_per_token < len(words) else "")
+            for i in range(0, len(words), words_per_token)
+        ]
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.threads = {}
+        self.runs = {}
+        self.files = {}
+        self.assistants = {}
+        self.bytes_uploaded = 0
+        self.request_count = 0
+        self.request_log = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def run_duration(self):
+        return self.first_token_delay + self.token_delay * (len(self.tokens) - 1)
+
+    def new_id(self, prefix):
+        with self._lock:
+            return f"{prefix}_{next(self._ids)}"
+
+    def record(self, method, path):
+        with self._lock:
+            self.request_count += 1
+            self.request_log.append((method, path))
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.request_log = []
+
+    def message(self, thread_id, role, text):
+        return {
+            "id": self.new_id("msg"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "role": role,
+            "status": "completed",
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "attachments": [],
+            "metadata": {},
+        }
+
+    def run(self, thread_id, assistant_id):
+        run = {
+            "id": self.new_id("run"),
+            "object": "thread.run",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "assistant_id": assistant_id,
+            "status": "queued",
+            "instructions": "",
+            "model": "gpt-4o-mini",
+            "tools": [],
+            "metadata": {},
+            "parallel_tool_calls": True,
+        }
+        self.runs[run["id"]] = (run, time.monotonic())
+        return run
+
+    def file(self, filename, size, purpose):
+        file = {
+            "id": self.new_id("file"),
+            "object": "file",
+            "bytes": size,
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self._lock:
+            self.bytes_uploaded += size
+            self.files[file["id"]] = file
+        return file
+
+    def assistant(self, body):
+        assistant = {
+            "id": self.new_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": body.get("name"),
+            "description": None,
+            "instructions": body.get("instructions"),
+            "model": body.get("model", "gpt-4o-mini"),
+            "tools": body.get("tools", []),
+            "tool_resources": body.get("tool_resources") or {},
+            "metadata": {},
+        }
+        self.assistants[assistant["id"]] = assistant
+        return assistant
+
+    # A non-streamed run is completed once run_duration has passed; the answer is added then
+    def run_status(self, run_id):
+        run, started = self.runs[run_id]
+        if run["status"] != "completed" and time.monotonic() - started >= self.run_duration:
+            run["status"] = "completed"
+            self.threads[run["thread_id"]].append(self.message(run["thread_id"], "assistant", "".join(self.tokens)))
+        elif run["status"] == "queued":
+            run["status"] = "in_progress"
+        return run
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: MockAssistantAPI = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_raw_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+
+    def _read_body(self):
+        return json.loads(self._read_raw_body() or b"{}")
+
+    # Only the size, name and purpose of a multipart upload are kept
+    def _upload_file(self):
+        body = self._read_raw_body()
+        boundary = self.headers.get("Content-Type", "").split("boundary=", 1)[-1].encode("utf-8")
+        fields = {}
+        size = 0
+        for part in body.split(b"--" + boundary):
+            headers, _, content = part.partition(b"\r\n\r\n")
+            name = re.search(rb'name="([^"]+)"', headers)
+            if name is None:
+                continue
+            content = content[:-2] if content.endswith(b"\r\n") else content
+            if name.group(1) == b"file":
+                filename = re.search(rb'filename="([^"]*)"', headers)
+                fields["filename"] = filename.group(1).decode("utf-8") if filename else "upload"
+                size = len(content)
+            else:
+                fields[name.group(1).decode("utf-8")] = content.decode("utf-8")
+        file = self.api.file(fields.get("filename", "upload"), size, fields.get("purpose", "assistants"))
+        return self._send_json(file)
+
+    def _send_not_found(self, kind, object_id):
+        error = {"message": f"No {kind} found with id '{object_id}'.", "type": "invalid_request_error", "code": None}
+        self._send_json({"error": error}, status=404)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_event(self, event, data):
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _stream_run(self, run):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        thread_id = run["thread_id"]
+        self._send_event("thread.run.created", run)
+        run["status"] = "in_progress"
+        self._send_event("thread.run.in_progress", run)
+
+        time.sleep(self.api.first_token_delay)
+        message = self.api.message(thread_id, "assistant", "")
+        message["status"] = "in_progress"
+        message["content"] = []
+        self._send_event("thread.message.created", message)
+        for index, token in enumerate(self.api.tokens):
+            if index:
+                time.sleep(self.api.token_delay)
+            delta = {
+                "id": message["id"],
+                "object": "thread.message.delta",
+                "delta": {"content": [{"index": 0, "type": "text", "text": {"value": token, "annotations": []}}]},
+            }
+            self._send_event("thread.message.delta", delta)
+
+        completed = self.api.message(thread_id, "assistant", "".join(self.api.tokens))
+        completed["id"] = message["id"]
+        self.api.threads[thread_id].append(completed)
+        self._send_event("thread.message.completed", completed)
+        run["status"] = "completed"
+        self._send_event("thread.run.completed", run)
+        self.wfile.write(b"event: done\ndata: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.api.record("POST", self.path)
+        if self.path == "/v1/files":
+            return self._upload_file()
+        body = self._read_body()
+
+        if self.path == "/v1/assistants":
+            return self._send_json(self.api.assistant(body))
+
+        if self.path == "/v1/threads":
+            thread_id = self.api.new_id("thread")
+            self.api.threads[thread_id] = []
+            return self._send_json({"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}})
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/messages", self.path)
+        if match:
+            thread_id = match.group(1)
+            message = self.api.message(thread_id, body.get("role", "user"), body.get("content", ""))
+            self.api.threads.setdefault(thread_id, []).append(message)
+            return self._send_json(message)
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs", self.path)
+        if match:
+            thread_id = match.group(1)
+            for extra in body.get("additional_messages") or []:
+                message = self.api.message(thread_id, extra.get("role", "user"), extra.get("content", ""))
+                self.api.threads.setdefault(thread_id, []).append(message)
+            run = self.api.run(thread_id, body.get("assistant_id"))
+            if body.get("stream"):
+                return self._stream_run(run)
+            return self._send_json(run)
+
+        self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def do_GET(self):
+        self.api.record("GET", self.path)
+        path = self.path.split("?", 1)[0]
+
+        for kind, objects in [("files", self.api.files), ("assistants", self.api.assistants)]:
+            match = re.fullmatch(rf"/v1/{kind}/([^/]+)", path)
+            if match:
+                if match.group(1) not in objects:
+                    return self._send_not_found(kind[:-1], match.group(1))
+                return self._send_json(objects[match.group(1)])
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs/([^/]+)", path)
+        if match:
+            return self._send_json(self.api.run_status(match.group(2)))
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/messages", path)
+        if match:
+            # Newest first, like the real API
+            messages = list(reversed(self.api.threads.get(match.group(1), [])))
+            return self._send_json({"object": "list", "data": messages, "has_more": False})
+
+        self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+
+    def do_DELETE(self):
+        self.api.record("DELETE", self.path)
+        for kind, objects, deleted in [
+            ("files", self.api.files, "file"),
+            ("assistants", self.api.assistants, "assistant.deleted"),
+        ]:
+            match = re.fullmatch(rf"/v1/{kind}/([^/]+)", self.path)
+            if match:
+                if objects.pop(match.group(1), None) is None:
+                    return self._send_not_found(kind[:-1], match.group(1))
+                return self._send_json({"id": match.group(1), "object": deleted, "deleted": True})
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)", self.path)
+        if match:
+            self.api.threads.pop(match.group(1), None)
+            return self._send_json({"id": match.group(1), "object": "thread.deleted", "deleted": True})
+
+        self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+
+# Start the mock API on localhost in a background thread, returns (server, base_url)
+def serve_mock_api(api):
+    handler = type("MockAssistantHandler", (_Handler,), {"api": api})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/v1"
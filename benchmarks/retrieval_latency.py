@@ -0,0 +1,55 @@
+# benchmarks/retrieval_latency.py
+# Usage: python -m benchmarks.retrieval_latency [--input data/output.txt] [--queries 200]
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from retrieval import HashingEmbedder, RetrievalIndex, build_index, tokenize
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure build and query latency of the local retrieval index.")
+    parser.add_argument("--input", default="data/output.txt")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    index_dir = tempfile.mkdtemp(prefix="ubt_index_")
+    try:
+        start = time.perf_counter()
+        built = build_index(args.input, index_dir, embedder=HashingEmbedder())
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = RetrievalIndex(built.index_dir)
+        load_seconds = time.perf_counter() - start
+        print(f"{len(index)} chunks, built in {build_seconds * 1000:.0f} ms, loaded in {load_seconds * 1000:.1f} ms")
+
+        # Questions are made of 3-6 words drawn from the corpus itself
+        rng = random.Random(42)
+        words = [word for word in tokenize(open(args.input, encoding="utf-8").read()) if len(word) > 3]
+        queries = [" ".join(rng.sample(words, rng.randint(3, 6))) for _ in range(args.queries)]
+
+        print(f"{'mode':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for mode, dense in [("bm25", False), ("hybrid", True)]:
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.retrieve(query, args.k, dense=dense)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{mode:>8} {statistics.median(latencies):>8.2f} {_percentile(latencies, 0.95):>8.2f}")
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/subject_loading.py
+# Usage: python -m benchmarks.subject_loading [--students 1000000]
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from library_data import BOOK_CSV, STUDENT_CSV, explode_subjects, join_books, load_books, load_students
+
+
+# The mock roster repeated with fresh student IDs up to the requested size
+def write_roster(path, students):
+    template = pd.read_csv(STUDENT_CSV)
+    rows = np.resize(np.arange(len(template)), students)
+    roster = template.iloc[rows].reset_index(drop=True)
+    roster["Student ID"] = [f"S{i:07d}" for i in range(students)]
+    roster.to_csv(path, index=False)
+
+
+# What the training scripts did: read, merge, eval every Subjects cell and explode
+def load_legacy(student_csv, cache_dir):
+    student_df = pd.read_csv(student_csv)
+    book_df = pd.read_csv(BOOK_CSV)
+    merged_df = pd.merge(student_df, book_df, left_on="E-Library Book ID", right_on="Book ID", how="left")
+    merged_df["Subjects"] = merged_df["Subjects"].apply(eval)
+    return merged_df.explode("Subjects").reset_index(drop=True)
+
+
+def load_shared(student_csv, cache_dir):
+    students, student_subjects = load_students(student_csv, cache_dir)
+    return explode_subjects(join_books(students, load_books(BOOK_CSV)), student_subjects)
+
+
+MODES = {"legacy": load_legacy, "library_data": load_shared}
+
+
+# Runs one mode in this process and prints seconds, peak RSS in MiB, rows and frame size in MiB
+def _measure(mode, student_csv, cache_dir):
+    start = time.perf_counter()
+    exploded = MODES[mode](student_csv, cache_dir)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size = exploded.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"{elapsed} {peak} {len(exploded)} {size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and explode time and peak memory of the student roster.")
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--measure", nargs=3, metavar=("MODE", "CSV", "CACHE_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        mode, student_csv, cache_dir = args.measure
+        return _measure(mode, student_csv, cache_dir if cache_dir != "-" else None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        student_csv = os.path.join(tmp, "students.csv")
+        write_roster(student_csv, args.students)
+        cache_dir = os.path.join(tmp, "cache")
+        print(f"{args.students:,} students, {os.path.getsize(student_csv) / 1024 / 1024:.0f} MiB CSV")
+        print(f"{'mode':>26} {'seconds':>8} {'peak RSS MiB':>13} {'rows':>10} {'frame MiB':>10}")
+        for label, mode, cache in [
+            ("eval + explode", "legacy", "-"),
+            ("library_data, from CSV", "library_data", "-"),
+            ("library_data, cold cache", "library_data", cache_dir),
+            ("library_data, Parquet", "library_data", cache_dir),
+        ]:
+            # A fresh process per mode, so peak memory is not inherited from an earlier run
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.subject_loading", "--measure", mode, student_csv, cache],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            seconds, peak, rows, size = float(output[0]), float(output[1]), int(output[2]), float(output[3])
+            print(f"{label:>26} {seconds:>8.2f} {peak:>13.0f} {rows:>10,} {size:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
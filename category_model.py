@@ -0,0 +1,172 @@
+# category_model.py
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, KFold, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from features import CATEGORICAL_FEATURES, UNKNOWN_CODE, encoded_matrix, load_feature_pipeline
+from library_data import BOOK_CSV, STUDENT_CSV, explode_subjects, join_books, load_books, load_students
+
+ARTIFACT_DIR = "data/models"
+
+# Bump when the layout of the saved artifact changes, so older artifacts are retrained
+ARTIFACT_VERSION = 3
+
+FEATURE_COLUMNS = CATEGORICAL_FEATURES
+
+PARAM_GRID = {
+    "n_neighbors": [3, 5, 7, 9, 11],
+    "weights": ["uniform", "distance"],
+    "metric": ["minkowski", "euclidean", "manhattan"],
+}
+
+
+# The book catalogue, students joined with the book they read, and that join with one row per (student, subject)
+def load_training_data(
+    student_csv: str = STUDENT_CSV,
+    book_csv: str = BOOK_CSV,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    students, student_subjects = load_students(student_csv)
+    book_df = load_books(book_csv)
+    merged_df = join_books(students, book_df)
+    exploded_df = explode_subjects(merged_df, student_subjects)
+    return book_df, merged_df, exploded_df
+
+
+# Books of every catalogue category ranked by how many students read them, most read first.
+# Per degree, books named after one of the degree's subjects are moved to the front.
+def build_recommendation_index(book_df: pd.DataFrame, merged_df: pd.DataFrame, exploded_df: pd.DataFrame) -> dict:
+    readers = merged_df["E-Library Book ID"].astype(object).value_counts()
+    books = book_df[["Book ID", "Category", "Name"]].dropna(subset=["Category", "Name"]).astype(object)
+    books["Readers"] = books["Book ID"].map(readers).fillna(0).astype(int)
+    # Several catalogue entries can share a title; they are one recommendation
+    ranked = (
+        books.groupby(["Category", "Name"], as_index=False)["Readers"].sum()
+        .sort_values(["Category", "Readers", "Name"], ascending=[True, False, True])
+    )
+    by_category: Dict[str, List[str]] = {
+        category: list(group["Name"]) for category, group in ranked.groupby("Category", sort=True)
+    }
+
+    degree_subjects = {
+        degree: set(subjects)
+        for degree, subjects in exploded_df.astype({"Degree": object}).groupby("Degree")["Subjects"]
+    }
+    by_category_and_degree: Dict[str, Dict[str, List[str]]] = {}
+    for category, names in by_category.items():
+        by_category_and_degree[category] = {}
+        for degree, subjects in degree_subjects.items():
+            matching = [name for name in names if name in subjects]
+            by_category_and_degree[category][degree] = matching + [name for name in names if name not in subjects]
+
+    return {"by_category": by_category, "by_category_and_degree": by_category_and_degree}
+
+
+# Up to top_n book names for a predicted category, ranked for the student's degree if it is known
+def recommend_books(artifact: dict, category: str, degree: Optional[str] = None, top_n: Optional[int] = 5) -> List[str]:
+    index = artifact["recommendations"]
+    books = index["by_category_and_degree"].get(category, {}).get(degree)
+    if books is None:
+        books = index["by_category"].get(category, [])
+    return books[:top_n] if top_n is not None else list(books)
+
+
+# Identifies a trained model: the input data, the grid and the library versions it was trained with
+def artifact_key(student_csv: str = STUDENT_CSV, book_csv: str = BOOK_CSV, param_grid: Optional[dict] = None) -> str:
+    digest = hashlib.sha256()
+    for path in (student_csv, book_csv):
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    settings = {
+        "param_grid": param_grid if param_grid is not None else PARAM_GRID,
+        "artifact_version": ARTIFACT_VERSION,
+        "sklearn": sklearn.__version__,
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def artifact_path(key: str, artifact_dir: str = ARTIFACT_DIR) -> str:
+    return os.path.join(artifact_dir, f"category_knn-{key[:16]}.joblib")
+
+
+# Grid-search the KNN category model and bundle it with everything prediction and recommendation need
+def train_category_model(
+    student_csv: str = STUDENT_CSV,
+    book_csv: str = BOOK_CSV,
+    param_grid: Optional[dict] = None,
+) -> dict:
+    param_grid = param_grid if param_grid is not None else PARAM_GRID
+    book_df, merged_df, exploded_df = load_training_data(student_csv, book_csv)
+
+    # The shared ordinal encoding, fitted once per dataset; the encoded matrix is cached memory-mapped
+    features = load_feature_pipeline(merged_df)
+    label_encoder = LabelEncoder().fit(exploded_df["Category"])
+    X = encoded_matrix(features, exploded_df)
+    y = label_encoder.transform(exploded_df["Category"])
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    cv = KFold(n_splits=5, shuffle=True, random_state=42)
+    grid_search = GridSearchCV(estimator=KNeighborsClassifier(), param_grid=param_grid, cv=cv, scoring="accuracy", n_jobs=-1)
+    grid_search.fit(X_train, y_train)
+    best_model = grid_search.best_estimator_
+
+    return {
+        "key": artifact_key(student_csv, book_csv, param_grid),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "model": best_model,
+        "best_params": grid_search.best_params_,
+        "test_accuracy": accuracy_score(y_test, best_model.predict(X_test)),
+        "features": features,
+        "label_encoder": label_encoder,
+        "recommendations": build_recommendation_index(book_df, merged_df, exploded_df),
+        # Values offered by the prediction form, in the order they first appear in the data
+        "options": {column: list(merged_df[column].dropna().astype(object).unique()) for column in FEATURE_COLUMNS},
+    }
+
+
+def save_artifact(artifact: dict, artifact_dir: str = ARTIFACT_DIR) -> str:
+    os.makedirs(artifact_dir, exist_ok=True)
+    path = artifact_path(artifact["key"], artifact_dir)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+# The artifact for the current data and grid: loaded if it was trained before, otherwise trained and saved
+def load_category_model(
+    student_csv: str = STUDENT_CSV,
+    book_csv: str = BOOK_CSV,
+    param_grid: Optional[dict] = None,
+    artifact_dir: str = ARTIFACT_DIR,
+) -> dict:
+    path = artifact_path(artifact_key(student_csv, book_csv, param_grid), artifact_dir)
+    if os.path.exists(path):
+        return joblib.load(path)
+    artifact = train_category_model(student_csv, book_csv, param_grid)
+    save_artifact(artifact, artifact_dir)
+    return artifact
+
+
+# Ordinal codes of the FEATURE_COLUMNS, and a mask of the rows without values the encoding never saw
+def encode_features(artifact: dict, students: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    X = artifact["features"].transform(students[FEATURE_COLUMNS])
+    return X, (X != UNKNOWN_CODE).all(axis=1)
+
+
+# Predicted category names for a frame with the FEATURE_COLUMNS of one or more students
+def predict_categories(artifact: dict, students: pd.DataFrame) -> List[str]:
+    X, _ = encode_features(artifact, students)
+    return list(artifact["label_encoder"].inverse_transform(artifact["model"].predict(X)))
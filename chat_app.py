@@ -3,55 +3,174 @@
 import time
 import streamlit as st
 from config import client
+from retrieval import build_context_message
 
-def run_chatbot(my_assistant, client):
+# Polling fallback: first check after 50 ms, then back off up to one second between checks
+POLL_INITIAL_DELAY = 0.05
+POLL_MAX_DELAY = 1.0
+POLL_BACKOFF = 1.5
+
+# A session keeps one thread until it holds this many messages, then starts a fresh one
+MAX_THREAD_MESSAGES = 40
+# Only the most recent messages of a thread are sent to the model on each run
+RUN_CONTEXT_MESSAGES = 10
+
+# Arguments shared by streamed and polled runs; the question rides along with the run itself, after
+# earlier_messages, exchanges answered from the cache that the thread has not seen yet
+def _run_arguments(assistant_id, thread_id, content=None, earlier_messages=None):
+    arguments = {
+        "thread_id": thread_id,
+        "assistant_id": assistant_id,
+        "truncation_strategy": {"type": "last_messages", "last_messages": RUN_CONTEXT_MESSAGES},
+    }
+    additional_messages = list(earlier_messages or [])
+    if content is not None:
+        additional_messages.append({"role": "user", "content": content})
+    if additional_messages:
+        arguments["additional_messages"] = additional_messages
+    return arguments
+
+# Raised when a stream breaks after its run was created; run is None if the stream broke before
+# announcing the run
+class StreamInterrupted(Exception):
+    def __init__(self, run, cause):
+        super().__init__(f"The answer stream broke off: {cause}")
+        self.run = run
+
+# Stream a run of the assistant on a thread, yielding the answer text as it is generated.
+# Errors opening the stream propagate as they are; no run was started then.
+def stream_assistant_response(client, assistant_id, thread_id, content=None, earlier_messages=None):
+    stream = None
+    try:
+        with client.beta.threads.runs.stream(**_run_arguments(assistant_id, thread_id, content, earlier_messages)) as stream:
+            yield from stream.text_deltas
+    except Exception as ex:
+        if stream is None:
+            raise
+        raise StreamInterrupted(stream.current_run, ex) from ex
+
+# Wait for a run to finish, polling with exponential backoff instead of a fixed sleep
+def wait_for_run(client, thread_id, run, initial_delay=POLL_INITIAL_DELAY, max_delay=POLL_MAX_DELAY, backoff=POLL_BACKOFF):
+    delay = initial_delay
+    while run.status in ["queued", "in_progress"]:
+        time.sleep(delay)
+        delay = min(delay * backoff, max_delay)
+        run = client.beta.threads.runs.retrieve(
+            thread_id=thread_id,
+            run_id=run.id
+        )
+    return run
+
+# Wait for a run that was already started and return its answer, or None. Without the run
+# itself, the latest run of the thread is the one the broken stream started.
+def poll_existing_run(client, thread_id, run=None):
+    if run is None:
+        runs = client.beta.threads.runs.list(thread_id=thread_id, limit=1)
+        if not runs.data:
+            return None
+        run = runs.data[0]
+    my_run = wait_for_run(client, thread_id, run)
+    if my_run.status != "completed":
+        return None
+
+    # Retrieve the assistant's response
+    all_messages = client.beta.threads.messages.list(thread_id=thread_id)
+    assistant_message = next(
+        (msg for msg in all_messages.data if msg.role == "assistant"), None
+    )
+    if assistant_message and assistant_message.content:
+        return assistant_message.content[0].text.value
+    return None
+
+# Run the assistant without streaming and return its latest answer, or None
+def poll_assistant_response(client, assistant_id, thread_id, content=None, earlier_messages=None):
+    my_run = client.beta.threads.runs.create(**_run_arguments(assistant_id, thread_id, content, earlier_messages))
+    return poll_existing_run(client, thread_id, my_run)
+
+# The conversation thread of this Streamlit session, replaced once it grows too long
+def get_session_thread(client, session_state):
+    thread_id = session_state.get("thread_id")
+    if thread_id is not None and session_state.get("thread_messages", 0) < MAX_THREAD_MESSAGES:
+        return thread_id
+
+    if thread_id is not None:
+        try:
+            client.beta.threads.delete(thread_id)
+        except Exception:
+            pass  # The old thread expires on its own if it cannot be deleted now
+
+    session_state["thread_id"] = client.beta.threads.create().id
+    session_state["thread_messages"] = 0
+    return session_state["thread_id"]
+
+def run_chatbot(my_assistant, client, retrieval_index=None, top_k=5, answer_cache=None, corpus_version=None):
     # Initialize session state for chat history
     if "messages" not in st.session_state:
         st.session_state["messages"] = []
     
-    # Function to get a response from the assistant
+    # Function to get a response from the assistant, yielding the answer as it arrives
     def get_gpt4_response(user_input):
         try:
-            # Create a new thread and add the user's input
-            my_thread = client.beta.threads.create()
-            client.beta.threads.messages.create(
-                thread_id=my_thread.id,
-                role="user",
-                content=user_input
-            )
-
-            # Run the assistant
-            my_run = client.beta.threads.runs.create(
-                thread_id=my_thread.id,
-                assistant_id=my_assistant.id,
-            )
-
-            # Polling to check if the run is complete
-            while my_run.status in ["queued", "in_progress"]:
-                time.sleep(2)
-                my_run = client.beta.threads.runs.retrieve(
-                    thread_id=my_thread.id,
-                    run_id=my_run.id
-                )
-
-            # Retrieve the assistant's response
-            all_messages = client.beta.threads.messages.list(thread_id=my_thread.id)
-            assistant_message = next(
-                (msg for msg in all_messages.data if msg.role == "assistant"), None
-            )
-            if assistant_message and assistant_message.content:
-                return assistant_message.content[0].text.value
-            else:
-                return "Sorry, no response generated by the assistant."
+            # Repeated questions are answered without a run, but only as the first turn of a conversation:
+            # a follow-up depends on the turns before it, which differ between sessions
+            first_turn = not st.session_state.get("thread_messages") and not st.session_state.get("pending_messages")
+            use_cache = answer_cache is not None and corpus_version is not None and first_turn
+            if use_cache:
+                cached_answer = answer_cache.get(user_input, corpus_version)
+                if cached_answer is not None:
+                    # The thread gets the exchange with the next run, so the assistant still sees this turn
+                    st.session_state["pending_messages"] = [
+                        {"role": "user", "content": user_input},
+                        {"role": "assistant", "content": cached_answer},
+                    ]
+                    yield cached_answer
+                    return
+            started = time.perf_counter()
+            answer = ""
+
+            # Send only the most relevant chunks of the corpus along with the question
+            content = user_input
+            if retrieval_index is not None:
+                content = build_context_message(user_input, retrieval_index.retrieve(user_input, top_k, dense=retrieval_index.embeddings is not None))
+
+            # Reuse the session's thread so the assistant sees the earlier turns
+            thread_id = get_session_thread(client, st.session_state)
+            earlier_messages = st.session_state.pop("pending_messages", None)
+            st.session_state["thread_messages"] += 2 + len(earlier_messages or [])
+
+            streamed = False
+            response = None
+            try:
+                for text in stream_assistant_response(client, my_assistant.id, thread_id, content, earlier_messages):
+                    streamed = True
+                    answer += text
+                    yield text
+            except StreamInterrupted as ex:
+                if streamed:
+                    raise
+                # The run and the question are already on the thread; wait for that run instead of starting another
+                response = poll_existing_run(client, thread_id, ex.run)
+            except Exception:
+                # The stream could not be opened, so no run was started; fall back to polling a new one
+                response = poll_assistant_response(client, my_assistant.id, thread_id, content, earlier_messages)
+            if not streamed and response:
+                streamed = True
+                answer = response
+                yield response
+
+            if not streamed:
+                yield "Sorry, no response generated by the assistant."
+            elif use_cache:
+                answer_cache.put(user_input, answer, corpus_version, time.perf_counter() - started)
         except Exception as e:
             st.error(f"An error occurred: {e}")
-            return "Sorry, I couldn't process your request."
+            yield "Sorry, I couldn't process your request."
     
     # Display chat interface
     st.title("Chat with UBT Assistant")
     
     chat_placeholder = st.empty() 
-    typing_placeholder = st.empty()  # Placeholder for "Bot is typing..."
+    new_message_placeholder = st.empty()  # Placeholder for the exchange in progress
     
     def display_chat():
         with chat_placeholder.container():
@@ -62,6 +181,8 @@ def run_chatbot(my_assistant, client):
                     st.markdown(f"**Bot:** {message['content']}")
     
     display_chat()
+    if answer_cache is not None:
+        st.caption(answer_cache.stats.summary())
     
     # Input form at the bottom of the page
     with st.form(key="chat_form", clear_on_submit=True):
@@ -72,19 +193,16 @@ def run_chatbot(my_assistant, client):
     if submit_button and user_input:
         # Add the user message to the chat history
         st.session_state["messages"].append({"role": "user", "content": user_input})
-        display_chat()  
-    
-        with typing_placeholder:
-            st.markdown("**Bot is typing...**")
-    
-        assistant_response = get_gpt4_response(user_input)
     
-        typing_placeholder.empty()
+        # Only the new exchange is rendered; the history above stays as it is
+        with new_message_placeholder.container():
+            st.markdown(f"**You:** {user_input}")
+            bot_placeholder = st.empty()
+            bot_placeholder.markdown("**Bot is typing...**")
     
         bot_message = {"role": "assistant", "content": ""}
         st.session_state["messages"].append(bot_message)
     
-        for i in range(len(assistant_response) + 1):
-            bot_message["content"] = assistant_response[:i]
-            display_chat()
-            time.sleep(0.05)
\ No newline at end of file
+        for text in get_gpt4_response(user_input):
+            bot_message["content"] += text
+            bot_placeholder.markdown(f"**Bot:** {bot_message['content']}")
@@ -0,0 +1,240 @@
+# cluster_model.py
+# Usage: python cluster_model.py refit   # explicit full refit, keeping group names stable
+#        python cluster_model.py update  # scheduled partial_fit on the current roster
+
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.compose import ColumnTransformer
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Book ID lists are split with pandas string methods instead
+    pa = pc = None
+
+from features import CATEGORICAL_FEATURES, load_feature_pipeline
+from library_data import BOOK_CSV, STUDENT_CSV
+
+CLUSTER_MODEL_PATH = "data/models/student_clusters.joblib"
+
+# Bump when the layout of the saved artifact changes, so older artifacts are refitted
+CLUSTER_ARTIFACT_VERSION = 2
+
+CLUSTER_COLUMNS = ["Degree", "Faculty", "Status"]
+BATCH_SIZE = 4096
+
+
+# Enum for Group Names
+class GroupNames(Enum):
+    LITERATURE = "Literature Enthusiasts"
+    TECH = "Tech Savvy Explorers"
+    LEADERS = "Future Leaders"
+    PHILOSOPHERS = "Philosophers & Thinkers"
+    SCIENCE = "Science Seekers"
+
+
+# Map Cluster IDs to GroupNames Enum; the mapping of the first fit, later fits keep each group's students
+cluster_to_group = {
+    0: GroupNames.LITERATURE,
+    1: GroupNames.TECH,
+    2: GroupNames.LEADERS,
+    3: GroupNames.PHILOSOPHERS,
+    4: GroupNames.SCIENCE
+}
+
+
+# Split a column of comma-separated book IDs. Rows share few distinct lists, so only those are split.
+# Returns the distinct list of every row, the offsets of each list's IDs and the stripped IDs; with
+# pyarrow installed the split runs in Arrow compute kernels.
+def split_book_ids(book_id_lists: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    list_ids, unique_lists = pd.factorize(book_id_lists.fillna('').astype(str))
+    unique_lists = np.asarray(unique_lists, dtype=object)
+    if pa is not None:
+        lists = pc.split_pattern(pa.array(unique_lists, type=pa.string()), ",")
+        offsets = lists.offsets.to_numpy()
+        book_ids = pc.utf8_trim_whitespace(pc.list_flatten(lists)).to_numpy(zero_copy_only=False)
+    else:
+        pieces = pd.Series(unique_lists, dtype=object).str.split(',').explode().str.strip()
+        offsets = np.r_[0, np.cumsum(np.bincount(pieces.index.to_numpy(), minlength=len(unique_lists)))]
+        book_ids = pieces.to_numpy(dtype=object)
+    return list_ids, offsets, book_ids
+
+
+def _catalogue_positions(catalogue: pd.Index, book_ids: np.ndarray) -> np.ndarray:
+    # Position of every ID in the catalogue index, -1 for IDs it does not have
+    return catalogue.get_indexer(book_ids)
+
+
+# Names of the books each student reads, from a comma-separated list of book IDs; IDs missing from
+# the catalogue read 'Unknown'. Every ID is matched against the indexed catalogue, then each list is
+# joined back together.
+def books_reading(student_df: pd.DataFrame, book_df: pd.DataFrame) -> pd.Series:
+    list_ids, offsets, book_ids = split_book_ids(student_df['E-Library Book ID'])
+    books = book_df.drop_duplicates('Book ID', keep='last')
+    positions = _catalogue_positions(pd.Index(books['Book ID']), book_ids)
+    # The extra last entry is what position -1 picks
+    names = np.append(books['Name'].fillna('Unknown').to_numpy(dtype=object), 'Unknown')[positions]
+    if pa is not None:
+        lists = pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), pa.array(names, type=pa.string()))
+        joined = pc.binary_join(lists, ", ").to_numpy(zero_copy_only=False)
+    else:
+        names = names.tolist()
+        joined = np.array([', '.join(names[start:end]) for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+    return pd.Series(joined[list_ids], index=student_df.index, dtype=object)
+
+
+# Student x book matrix counting how often each catalogue book appears in a student's book IDs.
+# Built once per distinct list, then gathered by row.
+def book_incidence(student_df: pd.DataFrame, catalogue: Sequence[str]) -> sparse.csr_matrix:
+    list_ids, offsets, book_ids = split_book_ids(student_df['E-Library Book ID'])
+    columns = _catalogue_positions(pd.Index(catalogue), book_ids)
+    lists = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    known = columns >= 0
+    list_matrix = sparse.csr_matrix(
+        (np.ones(known.sum(), dtype=np.float32), (lists[known], columns[known])),
+        shape=(len(offsets) - 1, len(catalogue)),
+    )
+    return list_matrix[list_ids]
+
+
+# A copy of the roster with the CLUSTER_COLUMNS replaced by their codes in the shared feature pipeline
+def encode_students(features: ColumnTransformer, roster: pd.DataFrame) -> pd.DataFrame:
+    codes = pd.DataFrame(features.transform(roster), columns=CATEGORICAL_FEATURES, index=roster.index)
+    students = roster.copy()
+    students[CLUSTER_COLUMNS] = codes[CLUSTER_COLUMNS]
+    return students
+
+
+# Encoded Degree, Faculty and Status next to the book-term counts, as one sparse CSR matrix
+def stack_features(students: pd.DataFrame, books_features: sparse.spmatrix) -> sparse.csr_matrix:
+    codes = sparse.csr_matrix(students[CLUSTER_COLUMNS].to_numpy(dtype=np.float32))
+    return sparse.hstack([codes, books_features], format='csr')
+
+
+# The features of students over the catalogue a model was fitted with; books added later are left out
+def feature_matrix(catalogue: Sequence[str], students: pd.DataFrame) -> sparse.csr_matrix:
+    return stack_features(students, book_incidence(students, catalogue))
+
+
+# Cluster IDs of students whose CLUSTER_COLUMNS hold the artifact's codes; no refitting involved
+def predict_clusters(artifact: dict, students: pd.DataFrame) -> np.ndarray:
+    return artifact["kmeans"].predict(feature_matrix(artifact["books"], students))
+
+
+def cluster_groups(artifact: dict) -> Dict[int, GroupNames]:
+    return {cluster_id: GroupNames[name] for cluster_id, name in enumerate(artifact["groups"])}
+
+
+# Give every new cluster the group of the old cluster most of its students were in (a maximum matching
+# of the old x new co-assignment counts), so a refit does not swap group names between clusters
+def _stable_groups(previous_groups: List[str], previous_labels: np.ndarray, labels: np.ndarray) -> List[str]:
+    n_clusters = len(previous_groups)
+    overlap = np.zeros((n_clusters, n_clusters), dtype=np.int64)
+    np.add.at(overlap, (labels, previous_labels), 1)
+    new_ids, old_ids = linear_sum_assignment(overlap, maximize=True)
+    groups = list(previous_groups)
+    for new_id, old_id in zip(new_ids, old_ids):
+        groups[new_id] = previous_groups[old_id]
+    return groups
+
+
+# Full refit on a roster with raw Degree/Faculty/Status values and its book IDs, over the Book IDs
+# of the catalogue. Refits the feature pipeline and centroids; group names carry over from previous.
+def refit_cluster_model(
+    roster: pd.DataFrame,
+    catalogue: Sequence[str],
+    previous: Optional[dict] = None,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    features = load_feature_pipeline(roster)
+    students = encode_students(features, roster)
+    books = list(pd.unique(pd.Series(catalogue, dtype=object)))
+    kmeans = MiniBatchKMeans(n_clusters=len(GroupNames), random_state=42, batch_size=batch_size)
+    labels = kmeans.fit_predict(feature_matrix(books, students))
+
+    if previous is None:
+        groups = [cluster_to_group[cluster_id].name for cluster_id in range(len(GroupNames))]
+    else:
+        previous_labels = predict_clusters(previous, encode_students(previous["features"], roster))
+        groups = _stable_groups(previous["groups"], previous_labels, labels)
+
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "version": CLUSTER_ARTIFACT_VERSION,
+        "fitted_at": now,
+        "updated_at": now,
+        "features": features,
+        "books": books,
+        "kmeans": kmeans,
+        "groups": groups,
+        "students": len(roster),
+    }
+
+
+# Move the centroids towards the current roster with partial_fit, one mini-batch at a time.
+# Cluster IDs, catalogue and encodings stay as they are; students with unseen values get code -1.
+def update_cluster_model(artifact: dict, roster: pd.DataFrame) -> dict:
+    X = feature_matrix(artifact["books"], encode_students(artifact["features"], roster))
+    kmeans = artifact["kmeans"]
+    for start in range(0, X.shape[0], kmeans.batch_size):
+        kmeans.partial_fit(X[start:start + kmeans.batch_size])
+    artifact["updated_at"] = datetime.now(timezone.utc).isoformat()
+    artifact["students"] = len(roster)
+    return artifact
+
+
+def save_cluster_model(artifact: dict, path: str = CLUSTER_MODEL_PATH) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+# The saved artifact, or None if there is none or it was saved in an older layout
+def load_cluster_model(path: str = CLUSTER_MODEL_PATH) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    artifact = joblib.load(path)
+    return artifact if artifact.get("version") == CLUSTER_ARTIFACT_VERSION else None
+
+
+def load_roster(student_csv: str = STUDENT_CSV, book_csv: str = BOOK_CSV) -> pd.DataFrame:
+    student_df = pd.read_csv(student_csv)
+    student_df['Books Reading'] = books_reading(student_df, pd.read_csv(book_csv))
+    return student_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or update the persisted student cluster model.")
+    parser.add_argument("action", choices=["refit", "update"])
+    parser.add_argument("--students", default=STUDENT_CSV)
+    parser.add_argument("--books", default=BOOK_CSV)
+    parser.add_argument("--path", default=CLUSTER_MODEL_PATH)
+    args = parser.parse_args()
+
+    roster = load_roster(args.students, args.books)
+    artifact = load_cluster_model(args.path)
+    if args.action == "update" and artifact is not None:
+        artifact = update_cluster_model(artifact, roster)
+    else:
+        catalogue = pd.read_csv(args.books, usecols=['Book ID'])['Book ID']
+        artifact = refit_cluster_model(roster, catalogue, previous=artifact)
+    save_cluster_model(artifact, args.path)
+    sizes = np.bincount(predict_clusters(artifact, encode_students(artifact["features"], roster)), minlength=len(artifact["groups"]))
+    for cluster_id, group in cluster_groups(artifact).items():
+        print(f"{cluster_id}: {group.value} ({sizes[cluster_id]} students)")
+
+
+if __name__ == "__main__":
+    main()
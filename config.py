@@ -1,13 +1,24 @@
 # config.py
 
 import os
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
 
 #Load .env
 load_dotenv()
 
+# Explicit timeouts: fail fast on connect, but leave room for long assistant runs
+OPENAI_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+OPENAI_MAX_RETRIES = 3
+
+# Keep-alive connections shared by every Streamlit session of this process
+OPENAI_CONNECTION_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
 # Initialize OpenAI client
 client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY")
+    api_key=os.getenv("OPENAI_API_KEY"),
+    timeout=OPENAI_TIMEOUT,
+    max_retries=OPENAI_MAX_RETRIES,
+    http_client=DefaultHttpxClient(limits=OPENAI_CONNECTION_LIMITS, timeout=OPENAI_TIMEOUT),
 )
@@ -0,0 +1,202 @@
+# crawl_store.py
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import itertools
+import json
+import os
+
+from frontier import canonicalize_url
+
+
+# SHA-256 of the extracted page text, used to detect pages whose content did not change
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Write JSON to a temporary file first so a crash never leaves a half-written file behind
+def write_json_atomic(path: str, data) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+# Per-URL metadata from previous crawls: ETag, Last-Modified, content hash, fetch time and links
+class CrawlMetadataStore:
+    def __init__(self, path: str = "data/crawl_state.json"):
+        self.path = path
+        self.pages: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.pages = json.load(f)
+
+    def get(self, url: str) -> Optional[dict]:
+        return self.pages.get(canonicalize_url(url))
+
+    def update(
+        self,
+        url: str,
+        content_hash: str,
+        links: List[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self.pages[canonicalize_url(url)] = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "last_fetched": datetime.now(timezone.utc).isoformat(),
+            "links": links,
+        }
+
+    # Refresh the fetch time of a page that turned out to be unchanged
+    def touch(self, url: str) -> None:
+        page = self.pages[canonicalize_url(url)]
+        page["last_fetched"] = datetime.now(timezone.utc).isoformat()
+        page.pop("failed_crawls", None)
+
+    # Count one more crawl in a row that failed to fetch the page; returns the count so far
+    def record_failure(self, url: str) -> int:
+        page = self.pages.get(canonicalize_url(url))
+        if page is None:
+            return 1
+        page["failed_crawls"] = page.get("failed_crawls", 0) + 1
+        return page["failed_crawls"]
+
+    def remove(self, url: str) -> None:
+        self.pages.pop(canonicalize_url(url), None)
+
+    def save(self) -> None:
+        write_json_atomic(self.path, self.pages)
+
+
+# Cut off a record that was only half written when the previous crawl crashed
+def _drop_partial_line(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            f.truncate(content.rfind(b"\n") + 1)
+
+
+# Appends one JSON record per crawled page to a JSONL file and flushes it every few pages
+class CrawlSink:
+    def __init__(self, path: str, flush_every: int = 10, append: bool = False):
+        self.path = path
+        self.flush_every = flush_every
+        if append:
+            _drop_partial_line(path)
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+        self._unflushed = 0
+
+    def write(self, url: str, status: int, text: str, link_count: int) -> None:
+        record = {
+            "url": url,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "status": status,
+            "text": text,
+            "links": link_count,
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+# Read the records of a crawl stream, skipping a last line cut short by a crash
+def read_crawl_records(path: str) -> Iterator[dict]:
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+# Produce the {url: text} output.json from a crawl stream without loading it into memory
+def export_output_json(
+    jsonl_path: str,
+    output_file: str,
+    extra_items: Iterable[Tuple[str, str]] = (),
+) -> List[str]:
+    written_urls = []
+    seen_urls = set()
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        records = ((record["url"], record["text"]) for record in read_crawl_records(jsonl_path))
+        for url, text in itertools.chain(records, extra_items):
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            # Same layout as json.dump(data, f, indent=4)
+            f.write("{\n" if not written_urls else ",\n")
+            f.write(f"    {json.dumps(url)}: {json.dumps(text)}")
+            written_urls.append(url)
+        f.write("\n}" if written_urls else "{}")
+    os.replace(tmp_path, output_file)
+    return written_urls
+
+
+def save_checkpoint(
+    path: str,
+    frontier_snapshot: dict,
+    in_flight: List[Tuple[str, int]],
+    gone_links: List[str],
+    failed_links: List[str] = (),
+) -> None:
+    write_json_atomic(
+        path,
+        {"frontier": frontier_snapshot, "in_flight": in_flight, "gone": gone_links, "failed": list(failed_links)},
+    )
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Stream (url, text) pairs from an output.json written with indent=4 without loading it whole.
+# json.dumps escapes newlines, so such a file holds exactly one entry per line.
+def iter_output_json(path: str) -> Iterator[Tuple[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        yielded = False
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line in ("{", "}", "{}", ""):
+                continue
+            try:
+                entry = json.loads("{" + line + "}")
+            except json.JSONDecodeError:
+                if yielded:
+                    raise
+                # Not one entry per line; fall back to loading the whole file
+                f.seek(0)
+                yield from json.load(f).items()
+                return
+            yield from entry.items()
+            yielded = True
+
+
+# Write the plain-text corpus the assistant searches, one separated block per page
+def write_text_output(pages: Iterable[Tuple[str, str]], text_output_file: str) -> None:
+    with open(text_output_file, "w", encoding="utf-8") as text_file:
+        for link, content in pages:
+            text_file.write(f"Content:\n{content}\n")
+            text_file.write("=" * 80 + "\n")  # Add a separator for readability
@@ -0,0 +1,137 @@
+# dedup.py
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+
+SIMHASH_BITS = 64
+# Four 16-bit bands: two fingerprints within 3 bits of each other share at least one band exactly
+SIMHASH_BANDS = 4
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# 64-bit SimHash over word shingles; similar texts get fingerprints with a small Hamming distance
+def simhash(text: str, shingle_size: int = 3) -> int:
+    words = text.lower().split()
+    shingles = [" ".join(words[i:i + shingle_size]) for i in range(max(len(words) - shingle_size + 1, 1))]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        shingle_hash = _hash64(shingle)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if shingle_hash >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+# Byte and page counts of one deduplication run
+class DedupStats:
+    def __init__(self):
+        self.pages_in = 0
+        self.pages_out = 0
+        self.duplicate_pages = 0
+        self.blocks_dropped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def reduction(self) -> float:
+        return 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Deduplication: {self.pages_out}/{self.pages_in} pages kept "
+            f"({self.duplicate_pages} near-duplicates), {self.blocks_dropped} repeated blocks dropped, "
+            f"{self.bytes_in / 1024:.0f} KiB -> {self.bytes_out / 1024:.0f} KiB ({self.reduction():.0%} smaller)"
+        )
+
+
+# Streaming near-duplicate page and repeated-block filter for scraped content.
+# Only fingerprints and block hashes are kept, never page text, so memory stays bounded.
+class ContentDeduplicator:
+    def __init__(
+        self,
+        max_distance: int = 3,
+        max_block_repeats: int = 1,
+        min_block_chars: int = 1,
+        max_tracked_blocks: int = 1_000_000,
+    ):
+        if max_distance >= SIMHASH_BANDS:
+            raise ValueError(f"max_distance must be below {SIMHASH_BANDS} for banded lookups")
+        self.max_distance = max_distance
+        self.max_block_repeats = max_block_repeats
+        self.min_block_chars = min_block_chars
+        self.max_tracked_blocks = max_tracked_blocks
+        self.stats = DedupStats()
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(SIMHASH_BANDS)]
+        self._block_counts: Dict[int, int] = {}
+
+    def _bands_of(self, fingerprint: int) -> List[int]:
+        mask = (1 << _BAND_BITS) - 1
+        return [fingerprint >> (band * _BAND_BITS) & mask for band in range(SIMHASH_BANDS)]
+
+    # Returns True if a near-duplicate was seen before, otherwise remembers the page
+    def _is_near_duplicate(self, text: str) -> bool:
+        fingerprint = simhash(text)
+        bands = self._bands_of(fingerprint)
+        for band, value in enumerate(bands):
+            for candidate in self._bands[band].get(value, []):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return True
+        for band, value in enumerate(bands):
+            self._bands[band].setdefault(value, []).append(fingerprint)
+        return False
+
+    # Blocks of a page not yet repeated elsewhere, their hashes, and the number of blocks left out.
+    # Nothing is counted yet, so a page that turns out to be a near-duplicate leaves no trace.
+    def _new_blocks(self, text: str) -> Tuple[List[str], List[int], int]:
+        kept_blocks, block_hashes = [], []
+        page_hashes = set()
+        dropped = 0
+        for block in text.splitlines():
+            block = block.strip()
+            if len(block) < self.min_block_chars:
+                continue
+            block_hash = _hash64(block)
+            if block_hash in page_hashes:
+                dropped += 1
+                continue
+            page_hashes.add(block_hash)
+            block_hashes.append(block_hash)
+            if self._block_counts.get(block_hash, 0) >= self.max_block_repeats:
+                dropped += 1
+            else:
+                kept_blocks.append(block)
+        return kept_blocks, block_hashes, dropped
+
+    def _count_blocks(self, block_hashes: List[int]) -> None:
+        for block_hash in block_hashes:
+            self._block_counts[block_hash] = self._block_counts.get(block_hash, 0) + 1
+        if len(self._block_counts) > self.max_tracked_blocks:
+            # Forget blocks seen only once; frequent boilerplate keeps its counts
+            self._block_counts = {h: c for h, c in self._block_counts.items() if c > 1}
+
+    # Cleaned text of a page, or None if the page is a near-duplicate or has nothing new.
+    # Pages are compared on what is left once repeated blocks (menus, headers, footers) are stripped,
+    # so pages sharing a large header but with different bodies are all kept.
+    def process(self, text: str) -> Optional[str]:
+        self.stats.pages_in += 1
+        self.stats.bytes_in += len(text.encode("utf-8"))
+
+        kept_blocks, block_hashes, dropped = self._new_blocks(text)
+        cleaned = "\n".join(kept_blocks)
+        if not cleaned or self._is_near_duplicate(cleaned):
+            self.stats.duplicate_pages += 1
+            return None
+        self._count_blocks(block_hashes)
+        self.stats.blocks_dropped += dropped
+
+        self.stats.pages_out += 1
+        self.stats.bytes_out += len(cleaned.encode("utf-8"))
+        return cleaned
+
+    def dedup_pages(self, pages: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        for url, text in pages:
+            cleaned = self.process(text)
+            if cleaned is not None:
+                yield url, cleaned
@@ -0,0 +1,103 @@
+# features.py
+
+from typing import Dict, List, Sequence
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+
+FEATURE_DIR = "data/features"
+
+CATEGORICAL_FEATURES = ["Degree", "Faculty", "Gender", "Status"]
+
+# Code given by the ordinal encoding to values it was not fitted on
+UNKNOWN_CODE = -1
+
+ORDINAL = "ordinal"
+ONE_HOT = "onehot"
+
+
+# The student feature encoding shared by category prediction, the random-forest experiment and clustering.
+# "ordinal" gives the same codes as a LabelEncoder per column (sorted values) and UNKNOWN_CODE for unseen
+# values; "onehot" gives one column per value and all zeros for unseen values. Other columns in
+# passthrough are appended unchanged.
+def build_feature_pipeline(
+    encoding: str = ORDINAL,
+    columns: Sequence[str] = CATEGORICAL_FEATURES,
+    passthrough: Sequence[str] = (),
+) -> ColumnTransformer:
+    if encoding == ORDINAL:
+        encoder = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=UNKNOWN_CODE, dtype=np.int64)
+    elif encoding == ONE_HOT:
+        encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False, dtype=np.float32)
+    else:
+        raise ValueError(f"Unknown encoding: {encoding}. Choose '{ORDINAL}' or '{ONE_HOT}'")
+    transformers = [("categorical", encoder, list(columns))]
+    if passthrough:
+        transformers.append(("passthrough", "passthrough", list(passthrough)))
+    return ColumnTransformer(transformers, remainder="drop", verbose_feature_names_out=False)
+
+
+def _settings_key(**settings) -> str:
+    settings["sklearn"] = sklearn.__version__
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+# Content hash of the columns a matrix is built from; categorical and object columns hash alike
+def frame_key(frame: pd.DataFrame, columns: Sequence[str]) -> str:
+    hashes = pd.util.hash_pandas_object(frame[list(columns)], index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+# The pipeline fitted on the values of frame, loaded from FEATURE_DIR if it was fitted on the same values before.
+# Every consumer that loads it for the same data therefore gets identical codes.
+def load_feature_pipeline(
+    frame: pd.DataFrame,
+    encoding: str = ORDINAL,
+    columns: Sequence[str] = CATEGORICAL_FEATURES,
+    passthrough: Sequence[str] = (),
+    feature_dir: str = FEATURE_DIR,
+) -> ColumnTransformer:
+    values = {column: sorted(frame[column].dropna().astype(str).unique()) for column in columns}
+    key = _settings_key(encoding=encoding, values=values, passthrough=list(passthrough), fitted_on="used columns")
+    path = os.path.join(feature_dir, f"pipeline-{encoding}-{key}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+
+    # Fitted on the columns it uses only, so frames with other extra columns share the cached pipeline
+    pipeline = build_feature_pipeline(encoding, columns, passthrough).fit(frame[list(columns) + list(passthrough)])
+    os.makedirs(feature_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, path)
+    return pipeline
+
+
+# The encoded feature matrix of frame, cached as a .npy file and returned memory-mapped,
+# so repeated training runs and other processes share it without encoding or loading it again
+def encoded_matrix(pipeline: ColumnTransformer, frame: pd.DataFrame, feature_dir: str = FEATURE_DIR) -> np.ndarray:
+    columns = list(pipeline.feature_names_in_)
+    key = _settings_key(frame=frame_key(frame, columns), pipeline=feature_names(pipeline), rows=len(frame))
+    path = os.path.join(feature_dir, f"matrix-{key}.npy")
+    if not os.path.exists(path):
+        os.makedirs(feature_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(pipeline.transform(frame)))
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+def feature_names(pipeline: ColumnTransformer) -> List[str]:
+    return list(pipeline.get_feature_names_out())
+
+
+# Values of each categorical column in code order: categories[column][code] decodes an ordinal code
+def feature_categories(pipeline: ColumnTransformer) -> Dict[str, np.ndarray]:
+    _, encoder, columns = pipeline.transformers_[0]
+    return dict(zip(columns, encoder.categories_))
@@ -1,7 +1,54 @@
 # file_handler.py
+import gzip
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pdfplumber
 from docx import Document
+from crawl_store import write_json_atomic
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".doc", ".docx")
+
+# Plain text files are streamed in blocks of this many lines, as they have no pages
+TXT_LINES_PER_PAGE = 200
+
+# Part of every extraction cache key; bump it when the extracted text of a file would change
+EXTRACTOR_VERSION = f"1/pdfplumber-{pdfplumber.__version__}"
+
+
+class UnsupportedFileTypeError(ValueError):
+    pass
+
+
+class IngestionResult:
+    """
+    Outcome of ingesting one file.
+    :param path: Path of the source file.
+    :param pages_path: JSONL file holding one {"page", "text"} record per page, or None on error.
+    :param pages: Number of pages extracted.
+    :param chars: Number of characters extracted.
+    :param seconds: Time spent extracting the file.
+    :param error: Description of the failure, or None if the file was ingested.
+    :param cached: Whether the pages came from the extraction cache instead of the extractor.
+    :param source_bytes: Size of the source file.
+    """
+
+    def __init__(self, path, pages_path=None, pages=0, chars=0, seconds=0.0, error=None, cached=False, source_bytes=0):
+        self.path = path
+        self.pages_path = pages_path
+        self.pages = pages
+        self.chars = chars
+        self.seconds = seconds
+        self.error = error
+        self.cached = cached
+        self.source_bytes = source_bytes
+
+    @property
+    def ok(self):
+        return self.error is None
+
 
 def extract_data_from_file(file_path):
     """
@@ -17,17 +64,270 @@ def extract_data_from_file(file_path):
     elif ext in [".doc", ".docx"]:
         return extract_data_from_doc(file_path)
     else:
-        return "Unsupported file type."
+        raise UnsupportedFileTypeError(f"Unsupported file type: {ext or file_path}")
+
+
+def iter_file_pages(file_path):
+    """
+    Stream the text of a file page by page, so a large document is never held in memory whole.
+    :param file_path: Path to the file.
+    :return: Generator of page texts.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".pdf":
+        return iter_pdf_pages(file_path)
+    elif ext == ".txt":
+        return iter_txt_pages(file_path)
+    elif ext in [".doc", ".docx"]:
+        return iter_doc_pages(file_path)
+    else:
+        raise UnsupportedFileTypeError(f"Unsupported file type: {ext or file_path}")
+
 
 def extract_data_from_pdf(file_path):
+    return "".join(iter_pdf_pages(file_path))
+
+
+def iter_pdf_pages(file_path):
     with pdfplumber.open(file_path) as pdf:
-        text = ''.join([page.extract_text() for page in pdf.pages])
-    return text
+        for page in pdf.pages:
+            # Pages without a text layer (scans, images) return None
+            yield page.extract_text() or ""
+            page.close()  # Release the parsed layout of pages already extracted
+
 
 def extract_data_from_txt(file_path):
     with open(file_path, 'r', encoding='utf-8') as file:
         return file.read()
 
+
+def iter_txt_pages(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        lines = []
+        for line in file:
+            lines.append(line)
+            if len(lines) == TXT_LINES_PER_PAGE:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+
 def extract_data_from_doc(file_path):
     doc = Document(file_path)
     return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+
+
+def iter_doc_pages(file_path):
+    # Word documents have no fixed pages; the whole body is one page
+    yield extract_data_from_doc(file_path)
+
+
+def collect_documents(sources):
+    """
+    Expand directories into the supported files they contain.
+    :param sources: A directory, a file, or a list of them.
+    :return: Sorted list of file paths.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths.extend(
+                    os.path.join(root, name) for name in files if name.lower().endswith(SUPPORTED_EXTENSIONS)
+                )
+        else:
+            paths.append(source)
+    return sorted(paths)
+
+
+class ExtractionCacheStats:
+    """
+    Hits and misses of an extraction cache during one ingestion.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evicted = 0
+
+    def record(self, result):
+        if result.cached:
+            self.hits += 1
+            self.bytes_saved += result.source_bytes
+        elif result.ok:
+            self.misses += 1
+
+    def summary(self):
+        return (
+            f"Extraction cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.bytes_saved / 1024 / 1024:.1f} MiB of documents not re-parsed, {self.evicted} entries evicted"
+        )
+
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted pages, keyed on the SHA-256 of the file content and EXTRACTOR_VERSION.
+    Each entry is a gzip-compressed JSONL file of pages next to a small JSON file of counts.
+    The least recently used entries are evicted once the cache holds more than max_bytes.
+    :param cache_dir: Directory holding the entries.
+    :param max_bytes: Size bound of the compressed entries.
+    """
+
+    def __init__(self, cache_dir="data/extraction_cache", max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = ExtractionCacheStats()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path):
+        digest = hashlib.sha256(EXTRACTOR_VERSION.encode("utf-8") + b"\0")
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def pages_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.jsonl.gz")
+
+    def meta_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Counts of a cached entry, or None on a miss. A hit marks the entry as recently used.
+        """
+        try:
+            with open(self.meta_path(key), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(self.pages_path(key))
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def put(self, key, pages, chars):
+        write_json_atomic(self.meta_path(key), {"pages": pages, "chars": chars, "extractor": EXTRACTOR_VERSION})
+
+    def evict(self, protected=()):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        :param protected: Keys that must be kept, such as the entries of the current ingestion.
+        :return: Number of entries removed.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".jsonl.gz"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name[:-len(".jsonl.gz")]))
+                total += stat.st_size
+        removed = 0
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key in protected:
+                continue
+            for path in (self.meta_path(key), self.pages_path(key)):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+            removed += 1
+        self.stats.evicted += removed
+        return removed
+
+
+def _write_pages(file_path, out):
+    pages = chars = 0
+    for number, text in enumerate(iter_file_pages(file_path), start=1):
+        out.write(json.dumps({"page": number, "text": text}, ensure_ascii=False) + "\n")
+        pages += 1
+        chars += len(text)
+    return pages, chars
+
+
+def ingest_file(file_path, pages_path, cache=None):
+    """
+    Extract one file into a JSONL file of pages, writing each page as soon as it is extracted.
+    :param file_path: Path to the file.
+    :param pages_path: Where to write the pages when no cache is used.
+    :param cache: Optional ExtractionCache; the pages are then read from or written to the cache.
+    :return: IngestionResult; errors are reported in it rather than raised.
+    """
+    start = time.perf_counter()
+    tmp_path = None
+    try:
+        source_bytes = os.path.getsize(file_path)
+        if cache is None:
+            tmp_path = pages_path
+            with open(pages_path, "w", encoding="utf-8") as out:
+                pages, chars = _write_pages(file_path, out)
+            return IngestionResult(file_path, pages_path, pages, chars, time.perf_counter() - start, source_bytes=source_bytes)
+
+        key = cache.key(file_path)
+        pages_path = cache.pages_path(key)
+        meta = cache.get(key)
+        if meta is not None:
+            return IngestionResult(
+                file_path, pages_path, meta["pages"], meta["chars"], time.perf_counter() - start,
+                cached=True, source_bytes=source_bytes,
+            )
+
+        # Written under a temporary name so a crash or a parallel worker never sees half an entry
+        tmp_path = f"{pages_path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as out:
+            pages, chars = _write_pages(file_path, out)
+        os.replace(tmp_path, pages_path)
+        cache.put(key, pages, chars)
+        return IngestionResult(file_path, pages_path, pages, chars, time.perf_counter() - start, source_bytes=source_bytes)
+    except Exception as e:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return IngestionResult(file_path, seconds=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+
+
+def ingest_files(sources, output_dir="data/documents_text", max_workers=None, cache=None):
+    """
+    Extract many files in parallel across a process pool.
+    :param sources: A directory, a file, or a list of them.
+    :param output_dir: Directory for the per-file JSONL page files when no cache is used.
+    :param max_workers: Number of worker processes; defaults to the number of CPUs.
+    :param cache: Optional ExtractionCache that unchanged files are read from instead of parsed again.
+    :return: Generator of IngestionResult, in the order the files finish.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = collect_documents(sources)
+    used_keys = set()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(ingest_file, path, os.path.join(output_dir, f"{index:06d}.jsonl"), cache)
+            for index, path in enumerate(paths)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if cache is not None:
+                cache.stats.record(result)
+                if result.ok:
+                    used_keys.add(os.path.basename(result.pages_path)[:-len(".jsonl.gz")])
+            yield result
+    if cache is not None:
+        cache.evict(protected=used_keys)
+
+
+def iter_ingested_pages(results):
+    """
+    Stream ingested pages as (source, text) pairs, the shape write_text_output takes.
+    :param results: IngestionResult objects from ingest_files.
+    :return: Generator of ("path#page=N", text) pairs for pages that have text.
+    """
+    for result in results:
+        if not result.ok:
+            continue
+        opener = gzip.open if result.pages_path.endswith(".gz") else open
+        with opener(result.pages_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["text"].strip():
+                    yield f"{result.path}#page={record['page']}", record["text"]
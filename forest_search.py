@@ -0,0 +1,166 @@
+# forest_search.py
+
+from typing import Dict, List, Optional, Tuple
+import math
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, KFold, ParameterGrid
+
+PARAM_GRID = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_split": [2, 5, 10],
+}
+
+# Exhaustive GridSearchCV: every configuration fitted from scratch on every fold
+GRID = "grid"
+# Every configuration scored, but each forest is grown through the n_estimators values instead of refitted
+WARM_START = "warm"
+# Successive halving with n_estimators as the resource: only the best 1/factor of the configurations
+# are grown to the next n_estimators value
+HALVING = "halving"
+
+SEARCH_MODES = (GRID, WARM_START, HALVING)
+
+
+# Training and test rows of every fold, split and converted to the float32 forests train on once,
+# then shared by every configuration
+def cached_folds(X, y, cv) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    return [(X[train], y[train], X[test], y[test]) for train, test in cv.split(X, y)]
+
+
+def params_key(params: dict) -> tuple:
+    return tuple(sorted((name, repr(value)) for name, value in params.items()))
+
+
+# Grows forests with warm_start. Adding trees to a forest with an integer random_state builds exactly the
+# trees a fresh forest of the larger size would, so every score equals the one GridSearchCV computes.
+def _search_warm_start(folds, param_grid: dict, factor: Optional[int], random_state: int, n_jobs: int):
+    sizes = sorted(param_grid.get("n_estimators", [RandomForestClassifier().n_estimators]))
+    structure_grid = {name: values for name, values in param_grid.items() if name != "n_estimators"}
+    candidates = list(ParameterGrid(structure_grid))
+    if factor is None:
+        return _grow_each_forest(folds, candidates, sizes, random_state, n_jobs)
+
+    forests: Dict[Tuple[int, int], RandomForestClassifier] = {}
+    scores: Dict[Tuple[int, int], float] = {}
+    surviving = list(range(len(candidates)))
+    fits = trees = 0
+    for rung, size in enumerate(sizes):
+        rung_scores = {}
+        for candidate in surviving:
+            fold_scores = []
+            for fold, (X_train, y_train, X_test, y_test) in enumerate(folds):
+                forest = forests.get((candidate, fold))
+                if forest is None:
+                    forest = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, warm_start=True, **candidates[candidate])
+                    forests[(candidate, fold)] = forest
+                    built = 0
+                else:
+                    built = forest.n_estimators
+                forest.set_params(n_estimators=size).fit(X_train, y_train)
+                fits += 1
+                trees += size - built
+                fold_scores.append(accuracy_score(y_test, forest.predict(X_test)))
+            rung_scores[candidate] = scores[(candidate, size)] = float(np.mean(fold_scores))
+
+        if factor is not None and rung < len(sizes) - 1:
+            # Best mean score first, ties in grid order; the rest stop growing
+            keep = max(1, math.ceil(len(surviving) / factor))
+            surviving = sorted(surviving, key=lambda candidate: (-rung_scores[candidate], candidate))[:keep]
+            forests = {key: forest for key, forest in forests.items() if key[0] in surviving}
+
+    results = [(dict(candidates[candidate], n_estimators=size), score) for (candidate, size), score in scores.items()]
+    return results, fits, trees
+
+
+# Warm-start search without pruning: each forest is grown through every size before the next one is
+# built, so only one forest is held in memory at a time
+def _grow_each_forest(folds, candidates: List[dict], sizes: List[int], random_state: int, n_jobs: int):
+    results = []
+    fits = trees = 0
+    for params in candidates:
+        fold_scores: Dict[int, List[float]] = {size: [] for size in sizes}
+        for X_train, y_train, X_test, y_test in folds:
+            forest = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, warm_start=True, **params)
+            built = 0
+            for size in sizes:
+                forest.set_params(n_estimators=size).fit(X_train, y_train)
+                fits += 1
+                trees += size - built
+                built = size
+                fold_scores[size].append(accuracy_score(y_test, forest.predict(X_test)))
+        results.extend((dict(params, n_estimators=size), float(np.mean(fold_scores[size]))) for size in sizes)
+    return results, fits, trees
+
+
+# Search the random-forest grid on (X, y) with 5-fold CV. Returns the best parameters and CV score, the mean
+# CV score of every configuration scored (by params_key), the number of forest fits and trees built, and the
+# wall-clock time. Ties are broken in ParameterGrid order like GridSearchCV, so a mode that scores the
+# exhaustive winner picks the same parameters.
+def search_forest(
+    X,
+    y,
+    param_grid: Optional[dict] = None,
+    mode: str = HALVING,
+    cv=None,
+    factor: int = 3,
+    random_state: int = 42,
+    n_jobs: int = -1,
+) -> dict:
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}. Choose one of {', '.join(SEARCH_MODES)}")
+    param_grid = param_grid if param_grid is not None else PARAM_GRID
+    cv = cv if cv is not None else KFold(n_splits=5, shuffle=True, random_state=random_state)
+    start = time.perf_counter()
+
+    if mode == GRID:
+        search = GridSearchCV(
+            estimator=RandomForestClassifier(random_state=random_state), param_grid=param_grid,
+            cv=cv, scoring="accuracy", n_jobs=n_jobs, refit=False,
+        )
+        search.fit(X, y)
+        n_splits = cv.get_n_splits(X, y)
+        results = list(zip(search.cv_results_["params"], search.cv_results_["mean_test_score"]))
+        fits = len(results) * n_splits
+        trees = sum(params.get("n_estimators", RandomForestClassifier().n_estimators) for params, _ in results) * n_splits
+    else:
+        folds = cached_folds(X, y, cv)
+        results, fits, trees = _search_warm_start(
+            folds, param_grid, factor if mode == HALVING else None, random_state, n_jobs,
+        )
+
+    order = {params_key(params): index for index, params in enumerate(ParameterGrid(param_grid))}
+    best_params, best_score = min(results, key=lambda result: (-result[1], order[params_key(result[0])]))
+    return {
+        "mode": mode,
+        "best_params": best_params,
+        "best_score": best_score,
+        "candidates": len(results),
+        "scores": {params_key(params): score for params, score in results},
+        "fits": fits,
+        "trees": trees,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# The final model for the chosen parameters, fitted on the whole training set as GridSearchCV's refit would
+def fit_best_model(X, y, best_params: dict, random_state: int = 42) -> RandomForestClassifier:
+    return RandomForestClassifier(random_state=random_state, **best_params).fit(X, y)
+
+
+def search_summary(result: dict, param_grid: Optional[dict] = None, n_splits: int = 5) -> str:
+    param_grid = param_grid if param_grid is not None else PARAM_GRID
+    grid = list(ParameterGrid(param_grid))
+    grid_fits = len(grid) * n_splits
+    grid_trees = sum(params.get("n_estimators", RandomForestClassifier().n_estimators) for params in grid) * n_splits
+    return (
+        f"{result['mode']} search: {result['seconds']:.1f}s, {result['candidates']} configurations scored, "
+        f"{result['fits']} fits building {result['trees']} trees "
+        f"(exhaustive grid: {grid_fits} fits building {grid_trees} trees), CV accuracy {result['best_score']:.4f}"
+    )
@@ -0,0 +1,118 @@
+# frontier.py
+
+from collections import deque
+from typing import Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+import heapq
+import itertools
+
+BREADTH_FIRST = "bfs"
+DEPTH_FIRST = "dfs"
+SHORTEST_PATH_FIRST = "shortest"
+
+# Query parameters that only track the visitor and never change the page content
+DEFAULT_TRACKING_PARAMS = frozenset(
+    ["fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid"]
+)
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+# Normalize a URL so that different spellings of the same page share one key
+def canonicalize_url(url: str, tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS) -> str:
+    parsed = urlparse(url.strip().replace(" ", "%20"))
+    scheme = parsed.scheme.lower()
+
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+
+    path = parsed.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    tracking_params = set(tracking_params)
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key not in tracking_params and not key.startswith(TRACKING_PARAM_PREFIXES)
+    )
+
+    # The fragment never reaches the server, so it is dropped
+    return urlunparse((scheme, host, path, parsed.params, urlencode(query), ""))
+
+
+# URLs waiting to be crawled plus the set of every URL ever queued, keyed on canonical form
+class Frontier:
+    def __init__(self, mode: str = BREADTH_FIRST, tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS):
+        if mode not in (BREADTH_FIRST, DEPTH_FIRST, SHORTEST_PATH_FIRST):
+            raise ValueError(f"Unknown frontier mode: {mode}")
+        self.mode = mode
+        self.tracking_params = frozenset(tracking_params)
+        self.seen: Set[str] = set()
+        self._queue = deque()
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap) if self.mode == SHORTEST_PATH_FIRST else len(self._queue)
+
+    def __contains__(self, url: str) -> bool:
+        return self.canonicalize(url) in self.seen
+
+    def canonicalize(self, url: str) -> str:
+        return canonicalize_url(url, self.tracking_params)
+
+    # Mark URLs as seen without queueing them, e.g. excluded links
+    def mark_seen(self, urls: Iterable[str]) -> None:
+        self.seen.update(self.canonicalize(url) for url in urls)
+
+    # Queue a URL unless an equivalent one was queued before, returns whether it was added
+    def add(self, url: str, depth: int = 0) -> bool:
+        key = self.canonicalize(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+
+        self._push(url.split("#", 1)[0].replace(" ", "%20"), depth)
+        return True
+
+    def _push(self, url: str, depth: int) -> None:
+        if self.mode == SHORTEST_PATH_FIRST:
+            # Pages with fewer path segments (section hubs) are crawled before deep pages
+            segments = len([part for part in urlparse(self.canonicalize(url)).path.split("/") if part])
+            heapq.heappush(self._heap, (segments, depth, next(self._counter), url))
+        else:
+            self._queue.append((url, depth))
+
+    # Pending (url, depth) pairs in crawl order, without removing them
+    def pending(self) -> List[Tuple[str, int]]:
+        if self.mode == SHORTEST_PATH_FIRST:
+            return [(url, depth) for _, depth, _, url in sorted(self._heap)]
+        return list(self._queue) if self.mode == BREADTH_FIRST else list(reversed(self._queue))
+
+    # JSON-serializable state used for crawl checkpoints
+    def snapshot(self) -> dict:
+        return {"mode": self.mode, "seen": sorted(self.seen), "pending": self.pending()}
+
+    # Reload a snapshot; requeued (url, depth) pairs, e.g. pages in flight at checkpoint time, are queued again
+    def restore(self, snapshot: dict, requeued: Iterable[Tuple[str, int]] = ()) -> None:
+        self.seen = set(snapshot["seen"])
+        self._queue.clear()
+        self._heap = []
+        pending = [*requeued, *snapshot["pending"]]
+        # A depth-first frontier pops from the right, so it is refilled in reverse
+        for url, depth in reversed(pending) if self.mode == DEPTH_FIRST else pending:
+            self._push(url, depth)
+
+    # Next (url, depth) to crawl, or None when the frontier is empty
+    def pop(self) -> Optional[Tuple[str, int]]:
+        if self.mode == SHORTEST_PATH_FIRST:
+            if not self._heap:
+                return None
+            _, depth, _, url = heapq.heappop(self._heap)
+            return url, depth
+        if not self._queue:
+            return None
+        return self._queue.popleft() if self.mode == BREADTH_FIRST else self._queue.pop()
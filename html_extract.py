@@ -0,0 +1,91 @@
+# html_extract.py
+
+from typing import Callable, Dict, Iterable, List, Tuple
+from bs4 import BeautifulSoup
+
+DEFAULT_BACKEND = "lxml"
+
+# Elements whose text is page chrome or code rather than page content
+BOILERPLATE_TAGS = ("script", "style", "noscript", "template", "iframe", "svg", "nav", "footer")
+
+
+# Text and raw link targets of one page, produced by a single parse
+class ExtractedPage:
+    def __init__(self, text: str, hrefs: List[str]):
+        self.text = text
+        self.hrefs = hrefs
+
+
+# Collapse whitespace inside text nodes; whitespace-only nodes spanning a line break end a line
+def _join_text(fragments: Iterable[str]) -> str:
+    lines = []
+    current = []
+    for fragment in fragments:
+        words = fragment.split()
+        if words:
+            current.append(" ".join(words))
+        elif "\n" in fragment and current:
+            lines.append(" ".join(current))
+            current = []
+    if current:
+        lines.append(" ".join(current))
+    return "\n".join(lines)
+
+
+def _parse_with_lxml(html: str) -> Tuple[List[str], List[str]]:
+    from lxml import html as lxml_html
+
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    root = lxml_html.fromstring(html.encode("utf-8", "replace"), parser=parser)
+    hrefs = [anchor.get("href") for anchor in root.iter("a") if anchor.get("href") is not None]
+
+    for element in list(root.iter(*BOILERPLATE_TAGS)):
+        element.drop_tree()  # Keeps the tail text, which belongs to the parent
+    return list(root.itertext()), hrefs
+
+
+def _parse_with_selectolax(html: str) -> Tuple[List[str], List[str]]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    hrefs = [node.attributes.get("href") for node in tree.css("a[href]")]
+
+    tree.strip_tags(list(BOILERPLATE_TAGS))
+    fragments = [node.text_content for node in tree.root.traverse(include_text=True) if node.tag == "-text"]
+    return fragments, [href for href in hrefs if href is not None]
+
+
+def _parse_with_html_parser(html: str) -> Tuple[List[str], List[str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    hrefs = [anchor["href"] for anchor in soup.find_all("a", href=True)]
+
+    for element in soup(BOILERPLATE_TAGS):
+        element.decompose()
+    return list(soup.strings), hrefs
+
+
+BACKENDS: Dict[str, Callable[[str], Tuple[List[str], List[str]]]] = {
+    "lxml": _parse_with_lxml,
+    "selectolax": _parse_with_selectolax,
+    "html.parser": _parse_with_html_parser,
+}
+
+
+# Backends whose parser library is installed
+def available_backends() -> List[str]:
+    available = ["html.parser"]
+    for backend, module in [("lxml", "lxml.html"), ("selectolax", "selectolax.lexbor")]:
+        try:
+            __import__(module)
+            available.append(backend)
+        except ImportError:
+            pass
+    return available
+
+
+# Parse a page once and return its boilerplate-free text together with every link target
+def extract_page(html: str, backend: str = DEFAULT_BACKEND) -> ExtractedPage:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}. Choose one of {', '.join(BACKENDS)}")
+    fragments, hrefs = BACKENDS[backend](html)
+    return ExtractedPage(_join_text(fragments), hrefs)
@@ -0,0 +1,132 @@
+# library_data.py
+
+from typing import Optional, Tuple
+import ast
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+STUDENT_CSV = "data/mock_student_dataset.csv"
+BOOK_CSV = "data/mock_e_library_dataset.csv"
+CACHE_DIR = "data/library_cache"
+
+STUDENT_DTYPES = {
+    "Student ID": "category",
+    "First Name": "category",
+    "Last Name": "category",
+    "Age": "int16",
+    "Gender": "category",
+    "Status": "category",
+    "Degree": "category",
+    "Faculty": "category",
+    "E-Library Book ID": "category",
+}
+BOOK_DTYPES = {"Book ID": "category", "Category": "category", "Name": "category", "Description": "category"}
+
+
+# Split a column of Python list literals like "['Calculus', 'Linear Algebra']" into a student-subject table.
+# Rows share a handful of distinct lists (one per degree), so each distinct string is parsed once with
+# ast.literal_eval, which only accepts literals and never runs code from the CSV.
+def parse_subjects(subjects: pd.Series) -> pd.DataFrame:
+    list_ids, unique_lists = pd.factorize(subjects)
+    subject_ids = {}
+    list_codes = []
+    for value in unique_lists:
+        items = ast.literal_eval(value)
+        if not isinstance(items, (list, tuple)):
+            raise ValueError(f"Subjects must be a list literal, got {value!r}")
+        list_codes.append([subject_ids.setdefault(str(item), len(subject_ids)) for item in items])
+
+    # Subject codes of every distinct list laid end to end; a missing value (id -1) is an empty list
+    list_lengths = np.array([len(codes) for codes in list_codes] + [0], dtype=np.int64)
+    list_starts = np.concatenate([[0], np.cumsum(list_lengths)])
+    all_codes = np.array([code for codes in list_codes for code in codes], dtype=np.int32)
+
+    row_lengths = list_lengths[list_ids]
+    rows = np.repeat(np.arange(len(subjects)), row_lengths)
+    position_in_row = np.arange(len(rows)) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+    subject_codes = all_codes[list_starts[list_ids][rows] + position_in_row]
+
+    return pd.DataFrame({
+        "row": rows,
+        "Subject": pd.Categorical.from_codes(subject_codes, categories=list(subject_ids)),
+    })
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# Students with categorical dtypes, and their subjects as a separate (row, Subject) table.
+# With pyarrow installed both tables are cached as Parquet next to a hash of the CSV, so later
+# loads skip CSV parsing entirely.
+def load_students(path: str = STUDENT_CSV, cache_dir: Optional[str] = CACHE_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    cache_paths = None
+    if cache_dir is not None and _parquet_available():
+        key = _file_digest(path)
+        cache_paths = (
+            os.path.join(cache_dir, f"students-{key}.parquet"),
+            os.path.join(cache_dir, f"student_subjects-{key}.parquet"),
+        )
+        if all(os.path.exists(cache_path) for cache_path in cache_paths):
+            return pd.read_parquet(cache_paths[0]), pd.read_parquet(cache_paths[1])
+
+    header = pd.read_csv(path, nrows=0).columns
+    students = pd.read_csv(
+        path,
+        dtype={column: dtype for column, dtype in STUDENT_DTYPES.items() if column in header},
+        parse_dates=["Enrollment Date"] if "Enrollment Date" in header else False,
+    )
+    student_subjects = parse_subjects(students.pop("Subjects")) if "Subjects" in header else pd.DataFrame(
+        {"row": np.zeros(0, dtype=np.int64), "Subject": pd.Categorical([])}
+    )
+
+    if cache_paths is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        for frame, cache_path in zip((students, student_subjects), cache_paths):
+            tmp_path = f"{cache_path}.tmp"
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path)
+    return students, student_subjects
+
+
+def load_books(path: str = BOOK_CSV) -> pd.DataFrame:
+    header = pd.read_csv(path, nrows=0).columns
+    return pd.read_csv(path, dtype={column: dtype for column, dtype in BOOK_DTYPES.items() if column in header})
+
+
+# Students joined with the book they read (left join on the book ID), keeping the student row order
+def join_books(students: pd.DataFrame, books: pd.DataFrame) -> pd.DataFrame:
+    positions = pd.Index(books["Book ID"].astype(object)).get_indexer(students["E-Library Book ID"].astype(object))
+    matched = books.iloc[np.maximum(positions, 0)].reset_index(drop=True)
+    matched[positions < 0] = np.nan  # Book IDs missing from the catalogue
+    return pd.concat([students.reset_index(drop=True), matched], axis=1)
+
+
+# One row per (student, subject), like DataFrame.explode("Subjects") on the old list column:
+# a student without subjects keeps one row with a missing subject.
+def explode_subjects(frame: pd.DataFrame, student_subjects: pd.DataFrame) -> pd.DataFrame:
+    rows = student_subjects["row"].to_numpy()
+    codes = student_subjects["Subject"].cat.codes.to_numpy()
+    without_subjects = np.setdiff1d(np.arange(len(frame)), rows)
+    if len(without_subjects):
+        order = np.argsort(np.concatenate([rows, without_subjects]), kind="stable")
+        rows = np.concatenate([rows, without_subjects])[order]
+        codes = np.concatenate([codes, np.full(len(without_subjects), -1, dtype=codes.dtype)])[order]
+    exploded = frame.iloc[rows].reset_index(drop=True)
+    exploded["Subjects"] = pd.Categorical.from_codes(codes, categories=student_subjects["Subject"].cat.categories)
+    return exploded
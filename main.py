@@ -1,32 +1,49 @@
 import asyncio
-import json
+import itertools
+import os
+from crawl_store import iter_output_json, write_text_output
+from dedup import ContentDeduplicator
+from file_handler import ExtractionCache, ingest_files, iter_ingested_pages
 from scraper import crawl_links
 
 async def main():
     url = "https://www.ubt-uni.net/sq/ubt/"
     exclude_links = set()
     max_links = 150  # Scrape 150 links
+    concurrency = 8  # Number of browser pages fetching in parallel
+    incremental = True  # Only re-fetch pages that changed since the last run
+    resume = True  # Continue from the last checkpoint if the previous run crashed
     output_file = "data/output.json"  # Store output in this file
     text_output_file = "data/output.txt"  # Store plain text output here
+    documents_dir = "data/documents"  # Course handbooks (PDF/DOCX/TXT) added to the same corpus
 
     print("Starting the web scraping process...")
 
     # Scrape the links and store data in the specified output file
-    scraped_links = await crawl_links(url, exclude_links, max_links, output_file)
+    scraped_links = await crawl_links(url, exclude_links, max_links, output_file, concurrency, incremental=incremental, resume=resume)
     
     print(f"Scraped {len(scraped_links)} links:")
     for link in scraped_links:
         print(link)
 
-    # Convert JSON data to plain text
+    documents = []
+    if os.path.isdir(documents_dir):
+        print(f"Extracting documents from {documents_dir}...")
+        extraction_cache = ExtractionCache()  # Unchanged documents are not parsed again
+        for result in ingest_files(documents_dir, cache=extraction_cache):
+            if result.ok:
+                print(f"{result.path}: {result.pages} pages in {result.seconds:.2f}s")
+            else:
+                print(f"{result.path}: skipped ({result.error})")
+            documents.append(result)
+        print(extraction_cache.stats.summary())
+
+    # Drop near-duplicate pages and repeated blocks, then convert JSON data to plain text
     try:
-        with open(output_file, "r", encoding="utf-8") as json_file:
-            data = json.load(json_file)
-
-        with open(text_output_file, "w", encoding="utf-8") as text_file:
-            for link, content in data.items():
-                text_file.write(f"Content:\n{content}\n")
-                text_file.write("=" * 80 + "\n")  # Add a separator for readability
+        deduplicator = ContentDeduplicator()
+        pages = itertools.chain(iter_output_json(output_file), iter_ingested_pages(sorted(documents, key=lambda result: result.path)))
+        write_text_output(deduplicator.dedup_pages(pages), text_output_file)
+        print(deduplicator.stats.summary())
 
         print(f"Data successfully written to {text_output_file}")
 
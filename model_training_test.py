@@ -137,37 +137,37 @@
 
 #### TEST TEST TEST #####
 
+import sys
 import pandas as pd
-from sklearn.model_selection import train_test_split, GridSearchCV, KFold
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.preprocessing import LabelEncoder
+from forest_search import WARM_START, fit_best_model, search_forest, search_summary
+from features import ONE_HOT, encoded_matrix, feature_names, load_feature_pipeline
+from library_data import explode_subjects, join_books, load_books, load_students
 
-# Load the datasets
-student_df = pd.read_csv('data/mock_student_dataset.csv')
-book_df = pd.read_csv('data/mock_e_library_dataset.csv')
+# Load the datasets; subjects come as a separate student-subject table parsed without eval
+student_df, student_subjects = load_students('data/mock_student_dataset.csv')
+book_df = load_books('data/mock_e_library_dataset.csv')
 
 # Merge student_df and book_df on the 'E-Library Book ID' column
-merged_df = pd.merge(student_df, book_df, left_on='E-Library Book ID', right_on='Book ID', how='left')
+merged_df = join_books(student_df, book_df)
 
 # Drop 'Description' and 'Name' columns as they are not needed for clustering or prediction
 merged_df = merged_df.drop(columns=['Name', 'Description'])
 
-# Exploding the 'Subjects' column (convert string list to actual list)
-merged_df['Subjects'] = merged_df['Subjects'].apply(eval)  # Convert string lists to actual lists
-
-# Exploding the 'Subjects' column into multiple rows per student
-exploded_df = merged_df.explode('Subjects').reset_index(drop=True)
-
-# One-hot encoding for categorical columns (Degree, Faculty, Gender, Status)
-exploded_df = pd.get_dummies(exploded_df, columns=['Degree', 'Faculty', 'Gender', 'Status'], drop_first=True)
+# One row per student and subject, as exploding the old 'Subjects' list column did
+exploded_df = explode_subjects(merged_df, student_subjects)
 
 # Convert 'Category' into a numerical format (Label encoding)
 label_encoder = LabelEncoder()
 exploded_df['Category'] = label_encoder.fit_transform(exploded_df['Category'])
 
-# Define the target variable and features
-X = exploded_df.drop(columns=['Student ID', 'First Name', 'Last Name', 'E-Library Book ID', 'Book ID', 'Enrollment Date', 'Subjects'])
+# One-hot encoding for categorical columns (Degree, Faculty, Gender, Status) with the shared feature pipeline;
+# Age is passed through. Category is the target, so it is not a feature.
+# The encoded matrix is cached memory-mapped under data/features.
+feature_pipeline = load_feature_pipeline(exploded_df, ONE_HOT, passthrough=['Age'])
+X = pd.DataFrame(encoded_matrix(feature_pipeline, exploded_df), columns=feature_names(feature_pipeline))
 y = exploded_df['Category']
 
 # Check for any missing values in features
@@ -179,21 +179,17 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_
 print("Training set size:", X_train.shape)
 print("Test set size:", X_test.shape)
 
-# Initialize the RandomForestClassifier with hyperparameter tuning
-param_grid = {
-    'n_estimators': [50, 100, 200],
-    'max_depth': [None, 10, 20, 30],
-    'min_samples_split': [2, 5, 10],
-}
-
-cv = KFold(n_splits=5, shuffle=True, random_state=42)
-grid_search = GridSearchCV(estimator=RandomForestClassifier(random_state=42), param_grid=param_grid, cv=cv, scoring='accuracy', n_jobs=-1)
-
-# Train the model on the training data
-grid_search.fit(X_train, y_train)
-
-# Get the best model from the grid search
-best_model = grid_search.best_estimator_
+# Initialize the RandomForestClassifier with hyperparameter tuning over forest_search.PARAM_GRID.
+# The search mode is the first argument: "warm" (default), "halving" or the exhaustive "grid".
+# "warm" picks exactly the grid's parameters; "halving" is several times faster but may settle on a
+# slightly weaker configuration, since it stops growing candidates after the smallest forests.
+search_mode = sys.argv[1] if len(sys.argv) > 1 else WARM_START
+search = search_forest(X_train, y_train, mode=search_mode)
+print("\n" + search_summary(search))
+print("Best Hyperparameters:", search['best_params'])
+
+# Get the best model from the search, refitted on the training data
+best_model = fit_best_model(X_train, y_train, search['best_params'])
 
 # Make predictions on the test set using the best model
 y_pred = best_model.predict(X_test)
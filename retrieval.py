@@ -0,0 +1,288 @@
+# retrieval.py
+
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import zlib
+
+import numpy as np
+
+PAGE_SEPARATOR = "=" * 80
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant used when BM25 and dense results are combined
+RRF_K = 60
+
+# Prefix of the temporary directories indexes are built in
+BUILD_PREFIX = ".build-"
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+# Read the pages of output.txt, which separates pages with a line of "=" characters
+def read_text_pages(text_output_file: str) -> Iterator[str]:
+    page_lines = []
+    with open(text_output_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.rstrip("\n") == PAGE_SEPARATOR:
+                page = "".join(page_lines).strip()
+                if page.startswith("Content:"):
+                    page = page[len("Content:"):].strip()
+                if page:
+                    yield page
+                page_lines = []
+            else:
+                page_lines.append(line)
+
+
+# Split pages into overlapping windows of words so each chunk fits comfortably in a prompt
+def chunk_pages(pages: Iterator[str], chunk_words: int = 200, overlap: int = 40) -> Iterator[str]:
+    step = chunk_words - overlap
+    for page in pages:
+        words = page.split()
+        for start in range(0, max(len(words) - overlap, 1), step):
+            yield " ".join(words[start:start + chunk_words])
+
+
+# Offline embedding: signed feature hashing of words and character trigrams, L2-normalized.
+# Any callable mapping a list of texts to a (n, dim) float32 array can be used instead.
+class HashingEmbedder:
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                features = [token] + [token[i:i + 3] for i in range(len(token) - 2)]
+                for feature in features:
+                    feature_hash = zlib.crc32(feature.encode("utf-8"))
+                    sign = 1.0 if feature_hash & 0x80000000 else -1.0
+                    vectors[row, feature_hash % self.dim] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Name of the version directory of an index: the corpus content and every setting the build depends on.
+# Embedders are told apart by their name attribute.
+def index_version(corpus_sha256: str, chunk_words: int, overlap: int, embedder_name: Optional[str]) -> str:
+    settings = json.dumps([corpus_sha256, chunk_words, overlap, embedder_name])
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+
+# Build the BM25 (and optionally dense) index of a corpus file into a version directory under index_dir.
+# Published files are never rewritten, because RetrievalIndex objects of other sessions keep them
+# memory-mapped: the index is written to a temporary directory and renamed into place, and a version
+# that already exists is reused. Only the keep_versions most recent versions are kept on disk.
+def build_index(
+    text_output_file: str,
+    index_dir: str = "data/index",
+    chunk_words: int = 200,
+    overlap: int = 40,
+    embedder: Optional[Callable[[List[str]], np.ndarray]] = None,
+    keep_versions: int = 2,
+) -> "RetrievalIndex":
+    corpus_sha256 = file_sha256(text_output_file)
+    embedder_name = getattr(embedder, "name", None if embedder is None else type(embedder).__name__)
+    version_dir = os.path.join(index_dir, index_version(corpus_sha256, chunk_words, overlap, embedder_name))
+
+    if not os.path.exists(os.path.join(version_dir, "index.json")):
+        os.makedirs(index_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=index_dir)
+        try:
+            metadata = {
+                "corpus_sha256": corpus_sha256,
+                "chunk_words": chunk_words,
+                "overlap": overlap,
+                "embedder": embedder_name,
+            }
+            _write_index(text_output_file, build_dir, metadata, embedder)
+            try:
+                os.replace(build_dir, version_dir)
+            except OSError:
+                # Another session published the same version first; theirs is identical
+                if not os.path.exists(os.path.join(version_dir, "index.json")):
+                    raise
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+    else:
+        os.utime(version_dir)  # Reused versions count as just built when old ones are removed
+
+    _remove_old_versions(index_dir, keep_versions, version_dir)
+    return RetrievalIndex(version_dir, embedder)
+
+
+def _write_index(text_output_file: str, index_dir: str, metadata: dict, embedder: Optional[Callable]) -> None:
+    vocabulary: Dict[str, int] = {}
+    term_ids, doc_ids, term_freqs, doc_lengths = [], [], [], []
+    chunk_offsets = [0]
+
+    with open(os.path.join(index_dir, "chunks.bin"), "wb") as chunk_file:
+        pages = read_text_pages(text_output_file)
+        for doc_id, chunk in enumerate(chunk_pages(pages, metadata["chunk_words"], metadata["overlap"])):
+            encoded = chunk.encode("utf-8")
+            chunk_file.write(encoded)
+            chunk_offsets.append(chunk_offsets[-1] + len(encoded))
+
+            counts = Counter(tokenize(chunk))
+            doc_lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_ids.append(doc_id)
+                term_freqs.append(count)
+
+    # Postings sorted by term, so each term's documents are one contiguous slice
+    term_ids = np.array(term_ids, dtype=np.int32)
+    order = np.argsort(term_ids, kind="stable")
+    doc_freqs = np.bincount(term_ids, minlength=len(vocabulary))
+    num_docs = len(doc_lengths)
+    arrays = {
+        "postings_docs": np.array(doc_ids, dtype=np.int32)[order],
+        "postings_tf": np.array(term_freqs, dtype=np.float32)[order],
+        "term_offsets": np.concatenate([[0], np.cumsum(doc_freqs)]).astype(np.int64),
+        "idf": np.log(1 + (num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32),
+        "doc_lengths": np.array(doc_lengths, dtype=np.float32),
+        "chunk_offsets": np.array(chunk_offsets, dtype=np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(index_dir, f"{name}.npy"), array)
+
+    if embedder is not None and num_docs:
+        chunks = RetrievalIndex._read_chunks(index_dir, arrays["chunk_offsets"])
+        batches = [embedder(chunks[start:start + 256]) for start in range(0, num_docs, 256)]
+        np.save(os.path.join(index_dir, "embeddings.npy"), np.vstack(batches).astype(np.float32))
+
+    with open(os.path.join(index_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f, ensure_ascii=False)
+    # Written last: a directory with index.json is a complete index
+    with open(os.path.join(index_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump({**metadata, "num_chunks": num_docs}, f, indent=4)
+
+
+# Delete all but the keep_versions most recently built versions, never the current one. Sessions still
+# holding a deleted version keep reading it: an unlinked file stays readable while it is mapped.
+def _remove_old_versions(index_dir: str, keep_versions: int, current_dir: str) -> None:
+    versions = [
+        entry for entry in os.scandir(index_dir)
+        if entry.is_dir() and not entry.name.startswith(BUILD_PREFIX) and entry.path != current_dir
+    ]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[max(keep_versions - 1, 0):]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+# Query side of the index; every array is memory-mapped, so loading is nearly free
+class RetrievalIndex:
+    def __init__(self, index_dir: str, embedder: Optional[Callable] = None):
+        self.index_dir = index_dir
+        self.embedder = embedder
+        with open(os.path.join(index_dir, "index.json"), "r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+        with open(os.path.join(index_dir, "vocabulary.json"), "r", encoding="utf-8") as f:
+            self.vocabulary: Dict[str, int] = json.load(f)
+
+        def load(name):
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.postings_docs = load("postings_docs")
+        self.postings_tf = load("postings_tf")
+        self.term_offsets = load("term_offsets")
+        self.idf = load("idf")
+        self.doc_lengths = load("doc_lengths")
+        self.chunk_offsets = load("chunk_offsets")
+        self.average_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+        if self.chunk_offsets[-1]:
+            self._chunk_bytes = np.memmap(os.path.join(index_dir, "chunks.bin"), dtype=np.uint8, mode="r")
+        else:
+            self._chunk_bytes = np.zeros(0, dtype=np.uint8)  # An empty file cannot be memory-mapped
+
+        embeddings_path = os.path.join(index_dir, "embeddings.npy")
+        self.embeddings = np.load(embeddings_path, mmap_mode="r") if os.path.exists(embeddings_path) else None
+        if self.embeddings is not None and self.embedder is None:
+            dim = self.embeddings.shape[1]
+            if self.metadata["embedder"] == f"hashing-{dim}":
+                self.embedder = HashingEmbedder(dim)
+
+    @staticmethod
+    def _read_chunks(index_dir: str, chunk_offsets: np.ndarray) -> List[str]:
+        with open(os.path.join(index_dir, "chunks.bin"), "rb") as f:
+            data = f.read()
+        return [data[chunk_offsets[i]:chunk_offsets[i + 1]].decode("utf-8") for i in range(len(chunk_offsets) - 1)]
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def chunk(self, doc_id: int) -> str:
+        start, end = self.chunk_offsets[doc_id], self.chunk_offsets[doc_id + 1]
+        return bytes(self._chunk_bytes[start:end]).decode("utf-8")
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tf = self.postings_tf[start:end]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[docs] / self.average_length)
+            scores[docs] += self.idf[term_id] * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def dense_scores(self, query: str) -> np.ndarray:
+        if self.embeddings is None or self.embedder is None:
+            raise ValueError("This index was built without embeddings")
+        return np.asarray(self.embeddings @ self.embedder([query])[0])
+
+    # Indices of the k best scores; BM25 only ranks chunks sharing a term with the query
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int, matches_only: bool = True) -> List[int]:
+        k = min(k, int(np.count_nonzero(scores)) if matches_only else len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+    # Top-k (doc_id, score) pairs; dense=True fuses BM25 and embedding rankings with RRF
+    def search(self, query: str, k: int = 5, dense: bool = False) -> List[Tuple[int, float]]:
+        bm25 = self.bm25_scores(query)
+        if not dense:
+            return [(doc_id, float(bm25[doc_id])) for doc_id in self._top_k(bm25, k)]
+
+        similarity = self.dense_scores(query)
+        fused: Dict[int, float] = {}
+        candidates = k * 4
+        for ranking in (self._top_k(bm25, candidates), self._top_k(similarity, candidates, matches_only=False)):
+            for rank, doc_id in enumerate(ranking):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    # Text of the top-k chunks for a question, ready to be sent as context
+    def retrieve(self, query: str, k: int = 5, dense: bool = False) -> List[str]:
+        return [self.chunk(doc_id) for doc_id, _ in self.search(query, k, dense)]
+
+
+# Prompt that carries the retrieved chunks and the question in one user message
+def build_context_message(question: str, chunks: List[str]) -> str:
+    excerpts = "\n\n".join(f"[{i}] {chunk}" for i, chunk in enumerate(chunks, start=1))
+    return f"Excerpts:\n{excerpts}\n\nQuestion: {question}"
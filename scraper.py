@@ -1,8 +1,47 @@
-from typing import List, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, Playwright
+from crawl_store import (
+    CrawlMetadataStore,
+    CrawlSink,
+    content_hash,
+    export_output_json,
+    load_checkpoint,
+    read_crawl_records,
+    save_checkpoint,
+)
+from html_extract import BACKENDS, DEFAULT_BACKEND, extract_page
+from frontier import BREADTH_FIRST, DEFAULT_TRACKING_PARAMS, Frontier, canonicalize_url
+from requests.adapters import HTTPAdapter
+import asyncio
 import json
+import os
+import re
+import requests
+import statistics
+import time
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/97.0.4692.99 Safari/537.36"
+
+HTTP_TIER = "http"
+BROWSER_TIER = "browser"
+
+UNCHANGED = "unchanged"
+UPDATED = "updated"
+ADDED = "added"
+REMOVED = "removed"
+
+# Pages with less visible text than this are assumed to be rendered by JavaScript
+MIN_TEXT_CHARS = 200
+
+# An incremental crawl drops a page it could not fetch only once this many crawls in a row failed on it
+REMOVE_AFTER_FAILED_CRAWLS = 2
+
+_SCRIPT_OR_STYLE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+_EMPTY_APP_ROOT = re.compile(r"<div[^>]+id=[\"'](root|app|__next)[\"'][^>]*>\s*</div>", re.IGNORECASE)
+_NOSCRIPT_WARNING = re.compile(r"<noscript\b[^>]*>[^<]*(enable|activate)[^<]*javascript", re.IGNORECASE)
 
 # Utility to check if a URL is a file
 def _url_is_file(url: str) -> bool:
@@ -12,116 +51,487 @@ def _url_is_file(url: str) -> bool:
     return False
 
 
-# Extract internal links from a page
-def _find_internal_links(
-    current_url: str,
-    html: str,
-    base_domain: str,
-    visited_links: Set[str],
-    exclude_links: Set[str],
-    queue: List[str],
-    max_links: int,
-) -> Set[str]:
-    internal_links = set()
-    soup = BeautifulSoup(html, "html.parser")
-
-    for link in soup.find_all("a", href=True):
-        if link["href"] in ["http://", "https://"]:
+# Resolve a page's link targets and keep the internal ones, in page order and without duplicates
+def _find_internal_links(current_url: str, hrefs: List[str], base_domain: str) -> List[str]:
+    internal_links = {}
+
+    for href in hrefs:
+        if href in ["http://", "https://"]:
             continue
 
-        absolute_link = urljoin(current_url, link["href"])
+        absolute_link = urljoin(current_url, href)
 
-        if base_domain != urlparse(absolute_link).netloc:
+        if base_domain != urlparse(absolute_link).netloc or _url_is_file(absolute_link):
             continue
 
-        if (
-            absolute_link not in visited_links
-            and absolute_link not in exclude_links
-            and absolute_link not in queue
-            and not _url_is_file(absolute_link)
-        ):
-            absolute_link = absolute_link.replace(" ", "%20")  # Handle spaces
-            queue.append(absolute_link)
-            internal_links.add(absolute_link)
+        internal_links[absolute_link] = None
 
-        if len(internal_links) == max_links:
-            break
+    return list(internal_links)
 
-    return internal_links
 
+# Queue the links the frontier has not seen yet, at most max_links of them
+def _queue_links(frontier: Frontier, links: List[str], depth: int, max_links: int) -> List[str]:
+    queued_links = []
+    for link in links:
+        if frontier.add(link, depth):
+            queued_links.append(link)
+            if len(queued_links) == max_links:
+                break
+    return queued_links
 
-# Fetch a URL and return HTML content using Playwright
-async def _fetch_url(url: str, playwright: async_playwright) -> str:
-    try:
-        browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/97.0.4692.99 Safari/537.36"
-        )  # Set the user agent in the context
-        page = await context.new_page()
-
-        await page.goto(url)
-        html = await page.content()
-        await browser.close()
-        return html
-    except Exception as ex:
-        print(f"Error fetching URL: {url}. Exception: {ex}")
-        return ""
-
-
-# Crawl and extract links recursively using Playwright and store the data
+
+# Heuristic deciding whether a server response still needs JavaScript to show its content
+def _looks_script_rendered(html: str, min_text_chars: int = MIN_TEXT_CHARS) -> bool:
+    if _EMPTY_APP_ROOT.search(html) or _NOSCRIPT_WARNING.search(html):
+        return True
+    visible_text = _TAG.sub(" ", _SCRIPT_OR_STYLE.sub(" ", html))
+    return len(" ".join(visible_text.split())) < min_text_chars
+
+
+# Outcome of fetching one URL; html is empty when the page was skipped or failed
+class FetchResult:
+    def __init__(
+        self,
+        html: str = "",
+        status_code: int = 200,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.html = html
+        self.status_code = status_code
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+    @property
+    def gone(self) -> bool:
+        return self.status_code in (404, 410)
+
+    # No content because of an error (status 0 when there was no response at all); says nothing about whether
+    # the page still exists
+    @property
+    def failed(self) -> bool:
+        return not self.html and not self.not_modified and not self.gone and (self.status_code >= 400 or self.status_code == 0)
+
+
+# Pages served and fetch latencies for each fetch tier of a crawl
+class CrawlStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {HTTP_TIER: [], BROWSER_TIER: []}
+        self.escalations = 0
+        # Filled in by incremental crawls only
+        self.changes: Dict[str, int] = {UNCHANGED: 0, UPDATED: 0, ADDED: 0, REMOVED: 0}
+
+    def record(self, tier: str, seconds: float) -> None:
+        self.latencies[tier].append(seconds)
+
+    def pages_served(self, tier: str) -> int:
+        return len(self.latencies[tier])
+
+    def median_latency(self, tier: str) -> float:
+        latencies = self.latencies[tier]
+        return statistics.median(latencies) if latencies else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"{tier}: {self.pages_served(tier)} pages, median latency {self.median_latency(tier) * 1000:.0f} ms"
+            for tier in self.latencies
+        ]
+        lines.append(f"escalated to browser: {self.escalations} pages")
+        if any(self.changes.values()):
+            lines.append(", ".join(f"{change}: {count}" for change, count in self.changes.items()))
+        return "\n".join(lines)
+
+
+# Fetch pages over pooled keep-alive HTTP and fall back to Playwright for JS-rendered pages
+class TieredFetcher:
+    def __init__(
+        self,
+        playwright: Playwright,
+        concurrency: int,
+        stats: CrawlStats,
+        js_heuristic: Callable[[str], bool] = _looks_script_rendered,
+        browser_url_patterns: Optional[List[str]] = None,
+    ):
+        self.playwright = playwright
+        self.stats = stats
+        self.js_heuristic = js_heuristic
+        self.browser_url_patterns = [re.compile(pattern) for pattern in browser_url_patterns or []]
+
+        # One keep-alive connection per worker; requests negotiates gzip/deflate by default
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # requests blocks, so each worker gets a thread; the default executor has too few for larger pools
+        self._http_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="http-fetch")
+
+        # The browser is only launched once a page actually needs it
+        self._browser = None
+        self._context = None
+        self._browser_lock = asyncio.Lock()
+        self._idle_pages: List = []
+
+    # metadata from a previous crawl turns the HTTP request into a conditional one
+    async def fetch(self, url: str, metadata: Optional[dict] = None) -> FetchResult:
+        if not any(pattern.search(url) for pattern in self.browser_url_patterns):
+            start = time.perf_counter()
+            result = await self._fetch_http(url, metadata)
+            if result is not None and (result.not_modified or not result.html):
+                if result.not_modified:
+                    self.stats.record(HTTP_TIER, time.perf_counter() - start)
+                return result
+            if result is not None and not self.js_heuristic(result.html):
+                self.stats.record(HTTP_TIER, time.perf_counter() - start)
+                return result
+            if result is not None:
+                self.stats.escalations += 1
+
+        start = time.perf_counter()
+        html = await self._fetch_browser(url)
+        if not html:
+            return FetchResult(status_code=0)
+        self.stats.record(BROWSER_TIER, time.perf_counter() - start)
+        return FetchResult(html)
+
+    # Returns the result, with empty html for pages that should be skipped, or None to escalate to the browser
+    async def _fetch_http(self, url: str, metadata: Optional[dict] = None) -> Optional[FetchResult]:
+        headers = {}
+        if metadata and metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata and metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._http_executor, lambda: self.session.get(url, headers=headers, timeout=30)
+            )
+        except requests.RequestException as ex:
+            print(f"HTTP fetch failed for {url}, falling back to browser. Exception: {ex}")
+            return None
+
+        result = FetchResult(
+            status_code=response.status_code,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        if response.status_code >= 400:
+            print(f"Error fetching URL: {url}. Status: {response.status_code}")
+        elif "html" in response.headers.get("Content-Type", "text/html") and not result.not_modified:
+            result.html = response.text
+        return result
+
+    async def _fetch_browser(self, url: str) -> str:
+        page = await self._acquire_page()
+        try:
+            await page.goto(url)
+            return await page.content()
+        except Exception as ex:
+            print(f"Error fetching URL: {url}. Exception: {ex}")
+            return ""
+        finally:
+            self._idle_pages.append(page)
+
+    async def _acquire_page(self):
+        if self._idle_pages:
+            return self._idle_pages.pop()
+        async with self._browser_lock:
+            if self._context is None:
+                self._browser = await self.playwright.chromium.launch(headless=True)
+                self._context = await self._browser.new_context(user_agent=USER_AGENT)
+        return await self._context.new_page()
+
+    async def close(self) -> None:
+        self._http_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        if self._browser is not None:
+            await self._browser.close()
+
+
+# State shared by the workers of one crawl
+class _CrawlState:
+    def __init__(
+        self,
+        frontier: Frontier,
+        max_links: int,
+        stats: CrawlStats,
+        sink: CrawlSink,
+        checkpoint_file: str,
+        checkpoint_every: int = 25,
+        store: Optional[CrawlMetadataStore] = None,
+        previous_data: Optional[dict] = None,
+        parser_backend: str = DEFAULT_BACKEND,
+    ):
+        self.frontier = frontier
+        self.max_links = max_links
+        self.stats = stats
+        self.sink = sink
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_every = checkpoint_every
+        self.store = store
+        self.previous_data = previous_data or {}
+        self.parser_backend = parser_backend
+        self.scraped_keys: Set[str] = set()
+        self.gone_links: Set[str] = set()
+        # Pages that could not be fetched in this crawl because of an error
+        self.failed_links: Set[str] = set()
+        self.active: Dict[str, int] = {}
+        self.since_checkpoint = 0
+        self.done = False
+        self.changed = asyncio.Condition()
+
+    # Wait for the next (url, depth) to crawl, or None once the crawl is over
+    async def next_url(self) -> Optional[Tuple[str, int]]:
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.done or self.frontier or not self.active)
+            if self.done or not self.frontier:
+                # Nothing queued and nobody left who could queue more
+                self.done = True
+                self.changed.notify_all()
+                return None
+            url, depth = self.frontier.pop()
+            self.active[url] = depth
+            return url, depth
+
+    async def finish(self, url: str) -> None:
+        async with self.changed:
+            del self.active[url]
+            # Checkpoint only here, once the page's links are on the frontier
+            if self.since_checkpoint >= self.checkpoint_every:
+                self.checkpoint()
+            self.changed.notify_all()
+
+    # Flush the stream, then save the frontier so every checkpointed page is on disk
+    def checkpoint(self) -> None:
+        self.sink.flush()
+        save_checkpoint(
+            self.checkpoint_file,
+            self.frontier.snapshot(),
+            list(self.active.items()),
+            sorted(self.gone_links),
+            sorted(self.failed_links),
+        )
+        if self.store is not None:
+            self.store.save()
+        self.since_checkpoint = 0
+
+    # Append a page to the stream unless a resumed crawl already wrote it
+    def store_page(self, url: str, status: int, page_content: str, link_count: int) -> None:
+        key = canonicalize_url(url)
+        if key in self.scraped_keys:
+            return
+        self.scraped_keys.add(key)
+        self.sink.write(url, status, page_content, link_count)
+        self.since_checkpoint += 1
+        if len(self.scraped_keys) >= self.max_links:
+            self.done = True
+
+    # Metadata for a conditional request, only when the previous text is still in the output
+    def metadata_for(self, url: str) -> Optional[dict]:
+        if self.store is None:
+            return None
+        metadata = self.store.get(url)
+        if metadata is None or metadata["url"] not in self.previous_data:
+            return None
+        return metadata
+
+    # Compare a freshly fetched page with the previous crawl and update the metadata store
+    def record_page(self, url: str, page_content: str, links: List[str], result: FetchResult) -> None:
+        if self.store is None:
+            return
+        new_hash = content_hash(page_content)
+        metadata = self.metadata_for(url)
+        if metadata is None:
+            self.stats.changes[ADDED] += 1
+        elif metadata["content_hash"] == new_hash:
+            self.stats.changes[UNCHANGED] += 1
+        else:
+            self.stats.changes[UPDATED] += 1
+        self.store.update(url, new_hash, links, result.etag, result.last_modified)
+
+
+# Fetch one page, stream its text and queue its links
+async def _crawl_page(fetcher: TieredFetcher, state: _CrawlState, base_domain: str, current_url: str, depth: int) -> None:
+    print(f"Fetching HTML for URL: {current_url}")
+    metadata = state.metadata_for(current_url)
+    result = await fetcher.fetch(current_url, metadata)
+    if state.done:
+        return
+
+    if result.not_modified:
+        # Reuse the text and links stored by the previous crawl
+        page_content = state.previous_data[metadata["url"]]
+        links = metadata["links"]
+        state.stats.changes[UNCHANGED] += 1
+        state.store.touch(current_url)
+    elif result.html:
+        # One parse yields both the boilerplate-free text and the links
+        page = extract_page(result.html, state.parser_backend)
+        page_content = page.text
+        links = _find_internal_links(current_url, page.hrefs, base_domain)
+        state.record_page(current_url, page_content, links, result)
+    else:
+        if result.gone:
+            state.gone_links.add(current_url)
+        elif result.failed:
+            state.failed_links.add(current_url)
+        return
+
+    # Stream the content of the page to disk
+    state.store_page(current_url, result.status_code, page_content, len(links))
+    if state.done:
+        return
+
+    # Queue the internal links on the shared frontier
+    _queue_links(state.frontier, links, depth + 1, state.max_links)
+
+
+# Worker that keeps pulling URLs from the shared frontier
+async def _crawl_worker(fetcher: TieredFetcher, state: _CrawlState, base_domain: str) -> None:
+    while True:
+        next_url = await state.next_url()
+        if next_url is None:
+            return
+
+        current_url, depth = next_url
+        try:
+            await _crawl_page(fetcher, state, base_domain, current_url, depth)
+        except asyncio.CancelledError:
+            # The page stays in state.active so the checkpoint queues it again
+            raise
+        except Exception as ex:
+            print(f"Error crawling URL: {current_url}. Exception: {ex}")
+            state.failed_links.add(current_url)
+        await state.finish(current_url)
+
+
+# Pages of the previous output an incremental crawl keeps, dropping the ones that disappeared: pages that
+# answered 404/410, pages that failed in REMOVE_AFTER_FAILED_CRAWLS crawls in a row, and, when the crawl
+# reached every page it could, pages no longer linked from the site. A fetch error keeps the previous text.
+def _previous_pages_to_keep(state: _CrawlState, crawl_exhausted: bool) -> List[Tuple[str, str]]:
+    gone_keys = {canonicalize_url(url) for url in state.gone_links}
+    failed_keys = {canonicalize_url(url) for url in state.failed_links}
+    kept_pages = []
+
+    for url, page_content in state.previous_data.items():
+        key = canonicalize_url(url)
+        if key in state.scraped_keys:
+            continue
+        if key in failed_keys:
+            removed = state.store.record_failure(url) >= REMOVE_AFTER_FAILED_CRAWLS
+        else:
+            removed = key in gone_keys or crawl_exhausted
+        if removed:
+            state.stats.changes[REMOVED] += 1
+            state.store.remove(url)
+        else:
+            kept_pages.append((url, page_content))
+
+    return kept_pages
+
+
+# Crawl and extract links with a pool of workers sharing one HTTP session and one browser.
+# Pages are streamed to a JSONL file as they complete, and the crawl can be resumed from
+# its last checkpoint; output_file is produced from the stream once the crawl finishes.
 async def crawl_links(
     url: str,
     exclude_links: Set[str],
     max_links: int = 30,
     output_file="data/output.json",
+    concurrency: int = 4,
+    stats: Optional[CrawlStats] = None,
+    js_heuristic: Callable[[str], bool] = _looks_script_rendered,
+    browser_url_patterns: Optional[List[str]] = None,
+    frontier_mode: str = BREADTH_FIRST,
+    tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS,
+    incremental: bool = False,
+    state_file: str = "data/crawl_state.json",
+    stream_file: Optional[str] = None,
+    checkpoint_file: Optional[str] = None,
+    checkpoint_every: int = 25,
+    resume: bool = False,
+    parser_backend: str = DEFAULT_BACKEND,
 ) -> List[str]:
-    visited_links: Set[str] = set()
-    links_to_return: List[str] = []
-    scraped_data = {}
-
-    base_domain = urlparse(url).netloc
-    queue = [url]
-
-    async with async_playwright() as playwright:
-        while queue and len(scraped_data) < max_links:
-            current_url = queue.pop(0)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if parser_backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {parser_backend}")
 
-            if current_url in visited_links and _url_is_file(current_url):
-                continue
+    output_stem = os.path.splitext(output_file)[0]
+    stream_file = stream_file or f"{output_stem}.jsonl"
+    checkpoint_file = checkpoint_file or f"{output_stem}.checkpoint.json"
 
-            visited_links.add(current_url)
-            print(f"Fetching HTML for URL: {current_url}")
+    base_domain = urlparse(url).netloc
+    frontier = Frontier(frontier_mode, tracking_params)
+    stats = stats if stats is not None else CrawlStats()
 
-            html = await _fetch_url(current_url, playwright)
-            if not html:
-                continue
+    checkpoint = load_checkpoint(checkpoint_file) if resume else None
+    if checkpoint is not None:
+        frontier.restore(checkpoint["frontier"], checkpoint["in_flight"])
+        print(f"Resuming crawl with {len(frontier)} queued URLs from {checkpoint_file}")
+    else:
+        frontier.mark_seen(exclude_links)
+        frontier.add(url)
 
-            soup = BeautifulSoup(html, "html.parser")
-            page_content = soup.get_text(separator=" ").strip()
+    # Incremental crawls send conditional requests and keep unchanged pages from the last output
+    store = None
+    previous_data = {}
+    if incremental:
+        store = CrawlMetadataStore(state_file)
+        if os.path.exists(output_file):
+            with open(output_file, "r", encoding="utf-8") as f:
+                previous_data = json.load(f)
 
-            # Store the content of the page
-            scraped_data[current_url] = page_content
+    sink = CrawlSink(stream_file, append=checkpoint is not None)
+    state = _CrawlState(
+        frontier, max_links, stats, sink, checkpoint_file, checkpoint_every, store, previous_data, parser_backend
+    )
+    if checkpoint is not None:
+        state.gone_links.update(checkpoint["gone"])
+        state.failed_links.update(checkpoint.get("failed", []))
+        state.scraped_keys.update(canonicalize_url(record["url"]) for record in read_crawl_records(stream_file))
 
-            # Find internal links and recursively follow them
-            internal_links = _find_internal_links(
-                current_url=current_url,
-                html=html,
-                base_domain=base_domain,
-                visited_links=visited_links,
-                exclude_links=exclude_links,
-                queue=queue,
-                max_links=max_links,
-            )
+    try:
+        async with async_playwright() as playwright:
+            fetcher = TieredFetcher(playwright, concurrency, stats, js_heuristic, browser_url_patterns)
+            try:
+                # Workers stop once the frontier is exhausted or enough pages were scraped
+                await asyncio.gather(
+                    *(_crawl_worker(fetcher, state, base_domain) for _ in range(concurrency))
+                )
+            finally:
+                await fetcher.close()
+    except BaseException:
+        # Leave a checkpoint behind so the crawl can be resumed
+        state.checkpoint()
+        sink.close()
+        raise
+    sink.close()
 
-            # Add the internal links to the queue
-            queue.extend(internal_links)
+    if not state.scraped_keys and os.path.exists(output_file):
+        # Nothing could be fetched, e.g. the site is down: keep the previous output and crawl state as they are
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        print(f"No pages were scraped, keeping the previous {output_file}")
+        print(stats.summary())
+        return []
 
-            if len(scraped_data) >= max_links:
-                break
+    kept_pages = []
+    if incremental:
+        # Unreached pages only count as removed if the crawl ran out of links without any fetch error
+        crawl_exhausted = len(state.scraped_keys) < max_links and not state.failed_links
+        kept_pages = _previous_pages_to_keep(state, crawl_exhausted)
+        store.save()
 
-    # Save the scraped data into a JSON file
-    with open(output_file, "w") as f:
-        json.dump(scraped_data, f, indent=4)
+    # Produce the JSON output from the stream
+    scraped_urls = export_output_json(stream_file, output_file, kept_pages)
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
 
-    print(f"Scraped {len(scraped_data)} URLs and saved them in {output_file}")
-    return list(scraped_data.keys())  # Return the list of URLs scraped
\ No newline at end of file
+    print(f"Scraped {len(scraped_urls)} URLs and saved them in {output_file}")
+    print(stats.summary())
+    return scraped_urls  # Return the list of URLs scraped
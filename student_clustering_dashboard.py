@@ -1,26 +1,20 @@
+import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 from sklearn.preprocessing import LabelEncoder
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.feature_extraction.text import CountVectorizer
-from enum import Enum
-
-# Enum for Group Names
-class GroupNames(Enum):
-    LITERATURE = "Literature Enthusiasts"
-    TECH = "Tech Savvy Explorers"
-    LEADERS = "Future Leaders"
-    PHILOSOPHERS = "Philosophers & Thinkers"
-    SCIENCE = "Science Seekers"
-
-# Map Cluster IDs to GroupNames Enum
-cluster_to_group = {
-    0: GroupNames.LITERATURE,
-    1: GroupNames.TECH,
-    2: GroupNames.LEADERS,
-    3: GroupNames.PHILOSOPHERS,
-    4: GroupNames.SCIENCE
-}
+from cluster_model import (
+    BATCH_SIZE, CLUSTER_MODEL_PATH, books_reading, cluster_groups, cluster_to_group, encode_students, feature_matrix,
+    load_cluster_model, predict_clusters, refit_cluster_model, save_cluster_model,
+)
+from features import feature_categories, load_feature_pipeline
+from library_data import BOOK_CSV, STUDENT_CSV
+from student_search import StudentSearchIndex
+
+# Batch size of MiniBatchKMeans when StudentClusterer clusters on sparse features
+SPARSE_BATCH_SIZE = BATCH_SIZE
 
 # Singleton Pattern for KMeans Model
 class KMeansModel:
@@ -39,6 +33,21 @@ class KMeansModel:
             self.model = KMeans(n_clusters=5, random_state=42)
             KMeansModel._instance = self
 
+    def minibatch_model(self, batch_size=SPARSE_BATCH_SIZE):
+        # Same number of clusters, fitted on mini-batches of rows; accepts scipy sparse input
+        return MiniBatchKMeans(n_clusters=self.model.n_clusters, random_state=42, batch_size=batch_size)
+
+# The persisted cluster model, loaded once per version (modification time) of its file; it is only fitted
+# here if none was saved yet. Refits and partial_fit updates run outside the dashboard
+# (python cluster_model.py refit|update) and replace the file, so the next rerun loads the new version.
+@st.cache_resource
+def get_cluster_model(model_modified, _student_df, _book_df):
+    artifact = load_cluster_model()
+    if artifact is None:
+        artifact = refit_cluster_model(_student_df, _book_df['Book ID'])
+        save_cluster_model(artifact)
+    return artifact
+
 # Data Loader with Exception Handling
 class DataLoader:
     @staticmethod
@@ -51,39 +60,57 @@ class DataLoader:
 
 # Data Preprocessing
 class DataPreprocessor:
-    def __init__(self, student_df, book_df):
+    def __init__(self, student_df, book_df, features=None):
         self.student_df = student_df
         self.book_df = book_df
+        self.features = features
         self.degree_encoder = LabelEncoder()
         self.faculty_encoder = LabelEncoder()
         self.status_encoder = LabelEncoder()
 
     def preprocess(self):
-        self.student_df['Full Name'] = self.student_df['First Name'] + " " + self.student_df['Last Name']
+        # Works on a copy; the caller's frame keeps its raw values
+        student_df = self.student_df.copy()
+        student_df['Full Name'] = student_df['First Name'] + " " + student_df['Last Name']
         
-        # Create a dictionary to map Book IDs to Book Names
-        book_id_to_name = dict(zip(self.book_df['Book ID'], self.book_df['Name']))
+        # Generate a Books Reading column with book names (one entry per book ID in the student's list)
+        student_df['Books Reading'] = books_reading(student_df, self.book_df)
         
-        # Generate a Books Reading column with book names
-        self.student_df['Books Reading'] = self.student_df['E-Library Book ID'].apply(
-            lambda x: ', '.join([book_id_to_name.get(book_id.strip(), 'Unknown') for book_id in str(x).split(',')])
-        )
+        # Encode degree, faculty, and status with the shared ordinal feature pipeline (see features.py),
+        # so clustering uses the same codes as category prediction; a persisted cluster model brings its own
+        if self.features is None:
+            self.features = load_feature_pipeline(student_df)
+        codes = encode_students(self.features, student_df)
+        categories = feature_categories(self.features)
+        for column, encoder in (('Degree', self.degree_encoder), ('Faculty', self.faculty_encoder), ('Status', self.status_encoder)):
+            encoder.classes_ = categories[column]  # Decodes the pipeline's codes with inverse_transform
+            student_df[column] = codes[column]
         
-        # Encode degree, faculty, and status
-        self.student_df['Degree'] = self.degree_encoder.fit_transform(self.student_df['Degree'])
-        self.student_df['Faculty'] = self.faculty_encoder.fit_transform(self.student_df['Faculty'])
-        self.student_df['Status'] = self.status_encoder.fit_transform(self.student_df['Status'])
-        
-        return self.student_df
+        self.student_df = student_df
+        return student_df
 
 # Clustering
 class StudentClusterer:
-    def __init__(self, student_df, book_df):
+    def __init__(self, student_df, book_df, sparse_features=False, batch_size=SPARSE_BATCH_SIZE, model=None):
         self.student_df = student_df
         self.book_df = book_df
-        self.kmeans = KMeansModel.get_instance().model
+        self.sparse_features = sparse_features
+        self.model = model
+        if sparse_features:
+            self.kmeans = KMeansModel.get_instance().minibatch_model(batch_size)
+        else:
+            self.kmeans = KMeansModel.get_instance().model
 
     def cluster(self):
+        # A persisted cluster model only assigns students to its clusters; nothing is refitted
+        if self.model is not None:
+            self.student_df['Cluster'] = predict_clusters(self.model, self.student_df)
+            return self.student_df
+
+        if self.sparse_features:
+            self.student_df['Cluster'] = self.kmeans.fit_predict(self.sparse_feature_matrix())
+            return self.student_df
+
         # Use Degree, Faculty, Status, and Books Reading as features
         X = self.student_df[['Degree', 'Faculty', 'Status']]
         
@@ -102,54 +129,133 @@ class StudentClusterer:
         
         return self.student_df
 
+    def sparse_feature_matrix(self):
+        # Degree, Faculty and Status next to the sparse student x book incidence of the catalogue,
+        # built from the book IDs directly instead of tokenizing book names
+        return feature_matrix(self.book_df['Book ID'], self.student_df)
+
 # Streamlit Dashboard
 class ClusteringDashboard:
-    def __init__(self, student_df, degree_encoder, faculty_encoder):
+    OVERVIEW_COLUMNS = ['Full Name', 'Faculty', 'Degree', 'Books Reading']
+    # Rows of a cluster table sent to the browser at a time
+    PAGE_SIZE = 50
+
+    def __init__(self, student_df, degree_encoder, faculty_encoder, cluster_to_group=cluster_to_group, status_encoder=None):
         self.student_df = student_df
         self.degree_encoder = degree_encoder
         self.faculty_encoder = faculty_encoder
+        self.cluster_to_group = cluster_to_group
+        self.status_encoder = status_encoder
+
+        # Everything run() shows is prepared here once, so a rerun only renders
+        self.view = self._decoded_view()
+        self.clusters = {
+            cluster_id: group[self.OVERVIEW_COLUMNS].reset_index(drop=True)
+            for cluster_id, group in self.view.groupby('Cluster', sort=True)
+        }
+        # Profiles are looked up by Student ID in a hashed index rather than by scanning names
+        if 'Student ID' in self.view and self.view['Student ID'].is_unique:
+            self.profiles = self.view.set_index('Student ID')
+        else:
+            self.profiles = self.view.reset_index(drop=True)
+        self.student_ids = list(self.profiles.index)
+        self.student_names = dict(zip(self.student_ids, self.profiles['Full Name']))
+        self.search_index = StudentSearchIndex(self.profiles['Full Name'], [str(key) for key in self.student_ids])
+
+    @staticmethod
+    def _decode(encoder, codes):
+        # One vectorized lookup per column; codes the encoder never saw (-1) decode to 'Unknown'
+        decoded = pd.Categorical.from_codes(np.asarray(codes), categories=encoder.classes_)
+        if (decoded.codes < 0).any():
+            decoded = decoded.add_categories(['Unknown']).fillna('Unknown')
+        return decoded
+
+    def _decoded_view(self):
+        view = self.student_df.copy()
+        view['Degree'] = self._decode(self.degree_encoder, view['Degree'])
+        view['Faculty'] = self._decode(self.faculty_encoder, view['Faculty'])
+        if self.status_encoder is not None:
+            view['Status'] = self._decode(self.status_encoder, view['Status'])
+        else:
+            view['Status'] = np.where(view['Status'] == 1, 'Active', 'Inactive')
+        return view
 
     def run(self):
         st.set_page_config(page_title="Student Group Clustering Dashboard", layout="wide")
         st.title("\U0001F4DA Student Group Clustering Dashboard")
         st.sidebar.header("\U0001F50D Search Student")
-        selected_student_name = st.sidebar.selectbox("Select a student:", self.student_df['Full Name'].values)
-        selected_student = self.student_df[self.student_df['Full Name'] == selected_student_name].iloc[0]
+        # Only the best matches of the search go to the browser, never the whole roster
+        query = st.sidebar.text_input("Search by name or student ID:")
+        matches = [self.student_ids[position] for position in self.search_index.search(query)]
+        if not matches:
+            st.sidebar.warning("No student matches your search.")
+            # The stored selection may be from a roster this dashboard was not built from
+            previous = st.session_state.get('selected_student_id')
+            matches = [previous if previous in self.student_names else self.student_ids[0]]
+        selected_student_id = st.sidebar.selectbox("Select a student:", matches, format_func=self.student_names.get)
+        st.session_state['selected_student_id'] = selected_student_id
+        selected_student = self.profiles.loc[selected_student_id]
 
         st.subheader(f"\U0001F9D1‍\U0001F393 Student Profile: {selected_student['Full Name']}")
         col1, col2, col3 = st.columns([1, 1, 1])
 
         with col1:
-            st.markdown(f"**\U0001F393 Degree Program:** {self.degree_encoder.inverse_transform([selected_student['Degree']])[0]}")
-            st.markdown(f"**\U0001F3E2 Faculty:** {self.faculty_encoder.inverse_transform([selected_student['Faculty']])[0]}")
+            st.markdown(f"**\U0001F393 Degree Program:** {selected_student['Degree']}")
+            st.markdown(f"**\U0001F3E2 Faculty:** {selected_student['Faculty']}")
 
         with col2:
             st.markdown(f"**\U0001F4D6 Books Reading:** {selected_student['Books Reading']}")
-            st.markdown(f"**\U0001F4CA Group:** {cluster_to_group[selected_student['Cluster']].value}")
+            st.markdown(f"**\U0001F4CA Group:** {self.cluster_to_group[selected_student['Cluster']].value}")
 
         with col3:
             st.markdown(f"**\U0001F4C5 Enrollment Date:** {selected_student['Enrollment Date']}")
-            st.markdown(f"**\U0001F516 Status:** {'Active' if selected_student['Status'] == 1 else 'Inactive'}")
+            st.markdown(f"**\U0001F516 Status:** {selected_student['Status']}")
 
         st.subheader("\U0001F4CA Cluster Overview")
-        for cluster_id, group in self.student_df.groupby('Cluster'):
-            with st.expander(f"{cluster_to_group[cluster_id].value} ({len(group)} Students)"):
-                group['Degree'] = group['Degree'].apply(lambda x: self.degree_encoder.inverse_transform([x])[0])
-                group['Faculty'] = group['Faculty'].apply(lambda x: self.faculty_encoder.inverse_transform([x])[0])
-                st.dataframe(group[['Full Name', 'Faculty', 'Degree', 'Books Reading']].reset_index(drop=True))
+        for cluster_id, group in self.clusters.items():
+            with st.expander(f"{self.cluster_to_group[cluster_id].value} ({len(group)} Students)"):
+                self._render_page(cluster_id, group)
 
         st.subheader("\U0001F4AC Group Chatbot")
         st.info("Chat functionality will be available soon for student group interactions.")
 
-# Main Execution
-def main():
-    student_df = DataLoader.load_csv('data/mock_student_dataset.csv')
-    book_df = DataLoader.load_csv('data/mock_e_library_dataset.csv')
-    preprocessor = DataPreprocessor(student_df, book_df)
+    def _render_page(self, cluster_id, group):
+        # Only the selected page of the group is serialized
+        pages = max(1, -(-len(group) // self.PAGE_SIZE))
+        page = 1
+        if pages > 1:
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"cluster-page-{cluster_id}")
+        start = (page - 1) * self.PAGE_SIZE
+        rows = group.iloc[start:start + self.PAGE_SIZE]
+        st.dataframe(rows)
+        st.caption(f"Students {start + 1}-{start + len(rows)} of {len(group)}, page {page} of {pages}")
+
+# Modification times of the CSV files and the cluster model a dashboard is built from, None for a missing file
+def source_versions(student_csv=STUDENT_CSV, book_csv=BOOK_CSV, model_path=CLUSTER_MODEL_PATH):
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in (student_csv, book_csv, model_path))
+
+# The dashboard with its decoded views, built once per process and version of its sources (see source_versions);
+# reruns triggered by the sidebar only render it
+@st.cache_resource
+def get_dashboard(student_csv, book_csv, versions):
+    student_df = DataLoader.load_csv(student_csv)
+    book_df = DataLoader.load_csv(book_csv)
+    cluster_model = get_cluster_model(versions[-1], student_df, book_df)
+    preprocessor = DataPreprocessor(student_df, book_df, features=cluster_model['features'])
     processed_df = preprocessor.preprocess()
-    clusterer = StudentClusterer(processed_df, book_df)
+    clusterer = StudentClusterer(processed_df, book_df, model=cluster_model)
     clustered_df = clusterer.cluster()
-    dashboard = ClusteringDashboard(clustered_df, preprocessor.degree_encoder, preprocessor.faculty_encoder)
+    return ClusteringDashboard(
+        clustered_df, preprocessor.degree_encoder, preprocessor.faculty_encoder, cluster_groups(cluster_model),
+        preprocessor.status_encoder,
+    )
+
+# Main Execution
+def main(student_csv=STUDENT_CSV, book_csv=BOOK_CSV):
+    if not os.path.exists(CLUSTER_MODEL_PATH):
+        # The first launch fits and saves the model, so the dashboard is keyed on the saved version
+        get_cluster_model(None, DataLoader.load_csv(student_csv), DataLoader.load_csv(book_csv))
+    dashboard = get_dashboard(student_csv, book_csv, source_versions(student_csv, book_csv))
     dashboard.run()
 
 if __name__ == "__main__":
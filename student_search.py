@@ -0,0 +1,123 @@
+# student_search.py
+
+from typing import Dict, List, Sequence
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+SEARCH_RESULTS = 20
+
+
+def normalize_name(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text))
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).lower().split())
+
+
+def _trigrams(text: str) -> List[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+class StudentSearchIndex:
+    """
+    In-memory search over student names and IDs, so the dashboard sends a handful of matches to the
+    browser instead of the whole roster.
+    Matches are ranked: an exact name or ID first, then names or IDs starting with the query, then names
+    with a word starting with it, then names or IDs containing it anywhere. Within a rank, roster order.
+    :param names: Full name of every student.
+    :param student_ids: ID of every student, in the same order.
+    """
+
+    def __init__(self, names: Sequence[str], student_ids: Sequence[str]):
+        self.names = [normalize_name(name) for name in names]
+        self.student_ids = [normalize_name(student_id) for student_id in student_ids]
+
+        # Sorted (term, position) arrays for prefix lookups with a binary search; terms are whole names,
+        # IDs, and every word of a name
+        whole_terms, whole_positions = [], []
+        word_terms, word_positions = [], []
+        for position, (name, student_id) in enumerate(zip(self.names, self.student_ids)):
+            whole_terms += [name, student_id]
+            whole_positions += [position, position]
+            for word in name.split()[1:]:
+                word_terms.append(word)
+                word_positions.append(position)
+        self._whole = self._sorted_terms(whole_terms, whole_positions)
+        self._words = self._sorted_terms(word_terms, word_positions)
+
+        # Trigram -> positions, stored as one array sliced by offsets, for substring lookups
+        grams, positions = [], []
+        for position, (name, student_id) in enumerate(zip(self.names, self.student_ids)):
+            for gram in set(_trigrams(name) + _trigrams(student_id)):
+                grams.append(gram)
+                positions.append(position)
+        codes, unique_grams = pd.factorize(pd.Series(grams, dtype=object))
+        order = np.lexsort((np.asarray(positions, dtype=np.int64), codes))
+        self._gram_positions = np.asarray(positions, dtype=np.int64)[order]
+        self._gram_offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(unique_grams)))])
+        self._gram_codes: Dict[str, int] = {gram: code for code, gram in enumerate(unique_grams)}
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _sorted_terms(terms, positions):
+        terms = np.asarray(terms, dtype=object)
+        order = np.argsort(terms, kind="stable")
+        return terms[order], np.asarray(positions, dtype=np.int64)[order]
+
+    @staticmethod
+    def _prefixed(index, prefix: str):
+        # Positions of terms equal to prefix, and of all terms starting with it (those equal sort first)
+        terms, positions = index
+        start = np.searchsorted(terms, prefix, side="left")
+        exact_end = np.searchsorted(terms, prefix, side="right")
+        end = np.searchsorted(terms, prefix + "\U0010ffff", side="left")
+        return positions[start:exact_end], positions[start:end]
+
+    def _containing(self, query: str) -> np.ndarray:
+        grams = set(_trigrams(query))
+        if not grams:
+            # Shorter than a trigram: only prefixes are looked up
+            return np.zeros(0, dtype=np.int64)
+        if any(gram not in self._gram_codes for gram in grams):
+            return np.zeros(0, dtype=np.int64)
+        postings = sorted(
+            (self._gram_positions[self._gram_offsets[code]:self._gram_offsets[code + 1]]
+             for code in (self._gram_codes[gram] for gram in grams)),
+            key=len,
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        # Trigrams can all occur without the whole query occurring
+        return np.array(
+            [p for p in candidates if query in self.names[p] or query in self.student_ids[p]], dtype=np.int64,
+        )
+
+    def search(self, query: str, limit: int = SEARCH_RESULTS) -> List[int]:
+        """
+        Roster positions of the best matches for a name or ID fragment.
+        :param query: What was typed; case, accents and repeated spaces are ignored.
+        :param limit: Maximum number of positions returned.
+        :return: Up to limit positions, best match first; the first students in the roster for an empty query.
+        """
+        query = normalize_name(query)
+        if not query:
+            return list(range(min(limit, len(self))))
+
+        exact, whole = self._prefixed(self._whole, query)
+        _, words = self._prefixed(self._words, query)
+        matches: List[int] = []
+        seen = set()
+        # Substring matches are only looked up if the prefix ranks leave room
+        for tier in (exact, whole, words, None):
+            if tier is None:
+                tier = self._containing(query)
+            for position in np.sort(tier):
+                if len(matches) == limit:
+                    return matches
+                if position not in seen:
+                    seen.add(position)
+                    matches.append(int(position))
+        return matches